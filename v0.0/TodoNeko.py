@@ -1,15 +1,336 @@
 import sys
 import os
 import json
-from PyQt6.QtWidgets import QApplication, QLabel, QWidget, QMessageBox, QPushButton, QListWidget, QListWidgetItem, QInputDialog
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt, QTimer, QSize
+import time
+
+START_TIME = time.perf_counter()  # 启动计时起点
+
+from PyQt6.QtWidgets import QApplication, QWidget, QMessageBox, QPushButton, QListWidget, QListWidgetItem, QInputDialog
+from PyQt6.QtGui import QPixmap, QImage, QPainter
+from PyQt6.QtCore import (Qt, QTimer, QThreadPool, QObject, QRect, QPoint, QEvent,
+                          QCoreApplication, QStandardPaths, pyqtSignal)
 
 MAX_WIDTH = 200
 MAX_HEIGHT = 200
-TODO_FILE = "todo.json"
+
+# 待办文件放在用户数据目录，不随启动时的工作目录变化
+QCoreApplication.setApplicationName("TodoNeko")
+DATA_DIR = (QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+            or os.path.join(os.path.expanduser("~"), ".TodoNeko"))
+TODO_FILE = os.path.join(DATA_DIR, "todo.json")
+TODO_JOURNAL = os.path.join(DATA_DIR, "todo.journal")  # 快照之后的修改，每行一条
+OLD_TODO_FILE = os.path.abspath("todo.json")  # 旧版本写在启动时的工作目录
+SAVE_DELAY_MS = 500  # 合并窗口内的多次修改只写一次盘
+JOURNAL_COMPACT_BYTES = 256 * 1024  # 修改记录超过这个大小时重写快照
+DRAG_FRAME_MS = 16  # 拿不到屏幕刷新率时，拖动每帧的间隔
+
+# 启动各阶段耗时（毫秒），设置 TODONEKO_STARTUP_TIMINGS 环境变量时打印
+STARTUP_TIMINGS = {}
+
+
+def mark_startup(phase):
+    if phase in STARTUP_TIMINGS:
+        return
+    STARTUP_TIMINGS[phase] = round((time.perf_counter() - START_TIME) * 1000, 2)
+    if os.environ.get("TODONEKO_STARTUP_TIMINGS"):
+        print(f"启动耗时 {phase}: {STARTUP_TIMINGS[phase]} ms")
+
+
+mark_startup("imports")
+
+# 性能分析：与 v1.0 共用 profiling 模块（不依赖具体的 Qt 绑定），同样由 TODONEKO_PROFILE
+# 环境变量或 --profile 参数开启；记录处理函数耗时和事件循环卡顿，退出时写到数据目录下的 todoneko-profile.json
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "v1.0"))
+from profiling import ENABLED as PROFILE, PROFILER, StallWatchdog, profiled
+PROFILE_FILE = os.path.join(DATA_DIR, "todoneko-profile.json")
+
+
+def dump_profile():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    PROFILER.dump(PROFILE_FILE)
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 动画帧图片的查找目录：先找自己的 images，再借用 v1.0 的表情
+FRAME_DIRS = [
+    os.path.join(BASE_DIR, "images"),
+    os.path.join(BASE_DIR, os.pardir, "v1.0", "assets", "pet"),
+]
+# 帧名 -> 文件名
+FRAME_FILES = {
+    "normal": "normal.png",
+    "shake": "shake.png",
+    "happy": "happy.png",
+    "curious": "curious.png",
+    "wink": "wink.png",
+}
+REQUIRED_FRAMES = ["normal", "shake", "happy"]
+
+# 动画：帧序列 [(帧名, 持续毫秒), ...]；loop 为 False 时播完切到 next
+ANIMATIONS = {
+    "idle": {"frames": [("normal", 1500), ("shake", 1500)], "loop": True},  # 摇尾巴
+    "happy": {"frames": [("happy", 1500)], "loop": False, "next": "idle"},
+    "curious": {"frames": [("curious", 1200), ("wink", 300), ("curious", 900)], "loop": False, "next": "idle"},
+}
+
+
+# 精灵图集：所有帧预先缩放后拼进一张图，绘制时只取其中一块
+class SpriteAtlas:
+    def __init__(self, frame_files, frame_dirs, max_width, max_height):
+        images = {}
+        for name, file_name in frame_files.items():
+            for frame_dir in frame_dirs:
+                path = os.path.join(frame_dir, file_name)
+                image = QImage(path)
+                if not image.isNull():
+                    break
+            else:
+                continue
+            # 限制大小，保持纵横比
+            if image.width() > max_width or image.height() > max_height:
+                image = image.scaled(max_width, max_height,
+                                     Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+            images[name] = image
+
+        # 横向排列
+        width = sum(image.width() for image in images.values())
+        height = max((image.height() for image in images.values()), default=0)
+        atlas = QImage(max(width, 1), max(height, 1), QImage.Format.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.GlobalColor.transparent)
+        self.rects = {}
+        painter = QPainter(atlas)
+        x = 0
+        for name, image in images.items():
+            painter.drawImage(x, 0, image)
+            self.rects[name] = QRect(x, 0, image.width(), image.height())
+            x += image.width()
+        painter.end()
+        self.pixmap = QPixmap.fromImage(atlas)
+
+    def has_frame(self, name):
+        return name in self.rects
+
+    def frame_size(self, name):
+        return self.rects[name].size()
+
+
+# 动画引擎：按声明的帧序列播放，每帧只用一个单次定时器，只重绘宠物区域
+class SpriteAnimator(QObject):
+    def __init__(self, widget, atlas, animations, origin=QPoint(0, 0)):
+        super().__init__(widget)
+        self.widget = widget
+        self.atlas = atlas
+        self.animations = animations
+        self.origin = origin
+        self.animation = None
+        self.index = 0
+        self.frame = None
+        self.active = True
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.next_frame)
+
+    def frame_rect(self, frame=None):
+        frame = frame or self.frame
+        if frame is None:
+            return QRect()
+        return QRect(self.origin, self.atlas.frame_size(frame))
+
+    def play(self, name):
+        if name not in self.animations:
+            return False
+        self.animation = name
+        self.index = 0
+        self.show_frame()
+        return True
+
+    def frames(self):
+        # 跳过图集里没有的帧（比如缺少 curious / wink）
+        return [(frame, ms) for frame, ms in self.animations[self.animation]["frames"]
+                if self.atlas.has_frame(frame)]
+
+    def show_frame(self):
+        frames = self.frames()
+        if not frames:
+            spec = self.animations[self.animation]
+            if not spec.get("loop", True):
+                # 一次性动画的帧都不在图集里：直接切到下一个动画
+                self.play(spec.get("next", "idle"))
+                return
+            self.timer.stop()
+            return
+        frame, duration = frames[self.index % len(frames)]
+        if frame != self.frame:
+            dirty = self.frame_rect().united(self.frame_rect(frame))
+            self.frame = frame
+            self.widget.update(dirty)
+        if self.active and (len(frames) > 1 or not self.animations[self.animation].get("loop", True)):
+            self.timer.start(duration)
+
+    @profiled("next_frame")
+    def next_frame(self):
+        spec = self.animations[self.animation]
+        self.index += 1
+        if self.index >= len(self.frames()) and not spec.get("loop", True):
+            self.play(spec.get("next", "idle"))
+            return
+        self.show_frame()
+
+    # 窗口隐藏、最小化或被完全遮挡时暂停，不再产生定时器唤醒
+    def set_active(self, active):
+        if active == self.active:
+            return
+        self.active = active
+        if not active:
+            self.timer.stop()
+        elif self.animation is not None:
+            self.show_frame()
+
+    def paint(self, painter):
+        if self.frame is not None:
+            painter.drawPixmap(self.frame_rect(), self.atlas.pixmap, self.atlas.rects[self.frame])
+
+# 拖动窗口：优先交给窗口系统（QWindow.startSystemMove），否则把鼠标移动合并成每帧最多一次 move；
+# 跟随的窗口（如待办窗口）在同一帧里按按下时的相对位置各移动一次
+class DragController(QObject):
+    def __init__(self, widget):
+        super().__init__(widget)
+        self.widget = widget
+        self.followers = []
+        self.offsets = []  # 按下时各跟随窗口相对宠物的位置
+        self.press_pos = None
+        self.start_pos = None
+        self.target = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(DRAG_FRAME_MS)
+        self.frame_timer.timeout.connect(self.apply)
+
+    def add_follower(self, window):
+        self.followers.append(window)
+
+    def press(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        screen = self.widget.screen()
+        if screen is not None and screen.refreshRate() > 0:
+            self.frame_timer.setInterval(max(1, int(1000 / screen.refreshRate())))
+        self.offsets = [(w, w.pos() - self.widget.pos()) for w in self.followers if w.isVisible()]
+        handle = self.widget.windowHandle()
+        if handle is not None and handle.startSystemMove():
+            # 窗口系统负责移动，跟随窗口在 moved() 里同步
+            return
+        self.press_pos = event.globalPosition().toPoint()
+        self.start_pos = self.widget.pos()
+
+    def move(self, event):
+        if self.press_pos is None:
+            return
+        self.target = self.start_pos + event.globalPosition().toPoint() - self.press_pos
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def release(self, event):
+        if self.press_pos is not None:
+            self.frame_timer.stop()
+            self.apply()
+        self.press_pos = None
+
+    # 宠物窗口位置变了（包括窗口系统移动的），下一帧同步跟随窗口
+    def moved(self):
+        if self.offsets and not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def apply(self):
+        if self.target is not None:
+            self.widget.move(self.target)
+            self.target = None
+        pos = self.widget.pos()
+        for window, offset in self.offsets:
+            if window.isVisible() and window.pos() != pos + offset:
+                window.move(pos + offset)
+
+
+# 待办记录：内存中唯一的数据来源，列表项里只存记录 ID
+class TodoItem:
+    __slots__ = ("id", "text", "checked")
+
+    def __init__(self, todo_id, text, checked=False):
+        self.id = todo_id
+        self.text = text
+        self.checked = checked
+
+
+# 按 ID 保存待办记录（dict 保持插入顺序），按 ID 查找和删除都是 O(1)
+# 每次修改记一条变更，保存时只写这些变更：
+#   {"op": "add", "id": ..., "text": ..., "checked": ...}
+#   {"op": "check", "id": ..., "checked": ...}
+#   {"op": "delete", "id": ...}
+class TodoStore:
+    def __init__(self):
+        self.items = {}
+        self.next_id = 1
+        self.changes = []
+
+    def __iter__(self):
+        return iter(self.items.values())
+
+    def add(self, text, checked=False):
+        todo = self.insert(self.next_id, text, checked)
+        self.changes.append({"op": "add", "id": todo.id, "text": text, "checked": checked})
+        return todo
+
+    def insert(self, todo_id, text, checked):
+        todo = TodoItem(todo_id, text, checked)
+        self.items[todo_id] = todo
+        self.next_id = max(self.next_id, todo_id + 1)
+        return todo
+
+    def get(self, todo_id):
+        return self.items.get(todo_id)
+
+    def set_checked(self, todo_id, checked):
+        todo = self.items.get(todo_id)
+        if todo is None or todo.checked == checked:
+            return False
+        todo.checked = checked
+        self.changes.append({"op": "check", "id": todo_id, "checked": checked})
+        return True
+
+    def remove(self, todo_id):
+        if self.items.pop(todo_id, None) is not None:
+            self.changes.append({"op": "delete", "id": todo_id})
+
+    # 取走还没保存的变更
+    def take_changes(self):
+        changes, self.changes = self.changes, []
+        return changes
+
+    # 重放变更（加载修改记录时用，不再产生新的变更）；重复应用结果不变
+    def apply(self, change):
+        op = change["op"]
+        if op == "add":
+            self.insert(change["id"], change["text"], change["checked"])
+        elif op == "check" and change["id"] in self.items:
+            self.items[change["id"]].checked = change["checked"]
+        elif op == "delete":
+            self.items.pop(change["id"], None)
+
+    # 快照格式：[[内容, 是否完成, ID], ...]（旧文件没有 ID，按顺序编号）
+    def to_list(self):
+        return [[todo.text, todo.checked, todo.id] for todo in self.items.values()]
+
+    def load(self, rows):
+        self.items = {}
+        self.next_id = 1
+        self.changes = []
+        for row in rows:
+            self.insert(row[2] if len(row) > 2 else self.next_id, row[0], bool(row[1]))
+
 
 class Pet(QWidget):
+    save_failed = pyqtSignal(str)  # 保存线程写盘失败
     def __init__(self):
         super().__init__()
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | 
@@ -17,75 +338,108 @@ class Pet(QWidget):
                             Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, True)
 
-        # 获取当前脚本所在目录
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        # 图片列表（摇尾巴动画）
-        self.images = [
-            os.path.join(base_dir, "images", "normal.png"),
-            os.path.join(base_dir, "images", "shake.png"),
-            os.path.join(base_dir, "images", "happy.png")
-        ]
-        
-        # 加载所有图片并缩放到最大尺寸
-        self.pixmaps = []
-        for path in self.images:
-            pix = QPixmap(path)
-            if pix.isNull():
-                QMessageBox.critical(self, "错误", f"没有找到图片: {path}")
+        # 加载所有帧，预先缩放到最大尺寸并拼成图集
+        self.atlas = SpriteAtlas(FRAME_FILES, FRAME_DIRS, MAX_WIDTH, MAX_HEIGHT)
+        for name in REQUIRED_FRAMES:
+            if not self.atlas.has_frame(name):
+                QMessageBox.critical(self, "错误", f"没有找到图片: {os.path.join(FRAME_DIRS[0], FRAME_FILES[name])}")
                 sys.exit(1)
-            # 限制大小，保持纵横比
-            if pix.width() > MAX_WIDTH or pix.height() > MAX_HEIGHT:
-                pix = pix.scaled(MAX_WIDTH, MAX_HEIGHT, 
-                                 Qt.AspectRatioMode.KeepAspectRatio, 
-                                 Qt.TransformationMode.SmoothTransformation)
-            self.pixmaps.append(pix)
-
-        self.current_index = 0
-        self.label = QLabel(self)
-        self.label.setPixmap(self.pixmaps[self.current_index])
-        self.resize(self.pixmaps[0].width(), self.pixmaps[0].height() + 50)  # 给按钮留空间
-
-        # 定时器：每 2 秒切换图片
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.next_frame)
-        self.timer.start(1500)
-        self.showing_happy = False
+        pet_size = self.atlas.frame_size("normal")
+        self.resize(pet_size.width(), pet_size.height() + 50)  # 给按钮留空间
+
+        # 动画：默认摇尾巴
+        self.animator = SpriteAnimator(self, self.atlas, ANIMATIONS)
+        self.animator.play("idle")
 
-        # 鼠标拖动变量
-        self.old_pos = None
+        # 鼠标拖动
+        self.drag = DragController(self)
         # TodoNeko按钮
         self.todo_button = QPushButton("📝 TodoNeko", self)
-        self.todo_button.setGeometry(0, self.pixmaps[0].height(), self.pixmaps[0].width(), 40)
+        self.todo_button.setGeometry(0, pet_size.height(), pet_size.width(), 40)
         self.todo_button.clicked.connect(self.toggle_todo)
 
-        # 待办事项窗口
+        # 保存：修改先记在 todos.changes 里，定时器到期后在后台线程追加到修改记录
+        self.journal_bytes = 0
+        # 上次写盘失败：下次重写完整快照（内存里的记录是完整的）
+        self.needs_snapshot = False
+        self.save_failed.connect(self.on_save_failed)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.write_todo)
+        self.save_pool = QThreadPool(self)
+        self.save_pool.setMaxThreadCount(1)  # 单线程，保证写入顺序
+
+        # 待办事项窗口：宠物画出来后再在空闲时读取数据、构建窗口
         self.todo_window = None
-        self.todo_items = []
-        self.load_todo()
+        self.todos = TodoStore()
+        self.todo_loaded = False
+        self.painted = False
+
+    # 绘制当前帧（只有动画标记的脏区域会重绘）
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.animator.paint(painter)
+        painter.end()
+        if not self.painted:
+            self.painted = True
+            mark_startup("first_paint")
+            QTimer.singleShot(0, self.prepare_todo)
+
+    # 读取待办并构建（隐藏的）待办窗口
+    def prepare_todo(self):
+        if not self.todo_loaded:
+            self.load_todo()
+            self.todo_loaded = True
+            mark_startup("todo_loaded")
+        if self.todo_window is None:
+            self.create_todo_window()
+            mark_startup("todo_window")
+
+    # 不可见时暂停动画
+    def update_animation_state(self):
+        window = self.windowHandle()
+        visible = self.isVisible() and not self.isMinimized()
+        self.animator.set_active(visible and (window is None or window.isExposed()))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.windowHandle()
+        if window is not None and not getattr(self, "watching_expose", False):
+            # 被完全遮挡或切到其他桌面时窗口会变为未暴露
+            window.installEventFilter(self)
+            self.watching_expose = True
+        self.update_animation_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_animation_state()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_animation_state()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Expose:
+            QTimer.singleShot(0, self.update_animation_state)
+        return super().eventFilter(obj, event)
 
-    # 摇尾巴
-    def next_frame(self):
-        if self.showing_happy:
-            return
-        self.current_index = 1 - self.current_index  # 0 ↔ 1
-        self.label.setPixmap(self.pixmaps[self.current_index])
-    
     # 鼠标拖动
     def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.old_pos = event.globalPosition().toPoint()
+        self.drag.press(event)
     def mouseMoveEvent(self, event):
-        if self.old_pos:
-            delta = event.globalPosition().toPoint() - self.old_pos
-            self.move(self.x() + delta.x(), self.y() + delta.y())
-            self.old_pos = event.globalPosition().toPoint()
+        self.drag.move(event)
     def mouseReleaseEvent(self, event):
-        self.old_pos = None
+        self.drag.release(event)
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self.drag.moved()
 
      # 切换 Todo 窗口显示/隐藏
     def toggle_todo(self):
         if self.todo_window is None:
-            self.create_todo_window()
+            self.prepare_todo()
             self.todo_window.show()
         else:
             if self.todo_window.isVisible():
@@ -99,24 +453,25 @@ class Pet(QWidget):
         self.todo_window = QWidget(flags=Qt.WindowType.Window)
         self.todo_window.setWindowTitle("TodoNeko List")
         self.todo_window.setGeometry(self.x() + self.width(), self.y(), 300, 400)
-    
+
         # 点击 X 只隐藏窗口
         def on_close(event):
             event.ignore()
             self.todo_window.hide()
         self.todo_window.closeEvent = on_close
+        # 拖动宠物时待办窗口一起移动
+        self.drag.add_follower(self.todo_window)
 
 
         self.list_widget = QListWidget(self.todo_window)
         self.list_widget.setGeometry(10, 10, 280, 300)
         self.list_widget.itemChanged.connect(self.todo_item_checked)
 
-        # 加载已有待办事项
-        for text, checked in self.todo_items:
-            item = QListWidgetItem(text)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
-            self.list_widget.addItem(item)
+        # 加载已有待办事项：填充期间屏蔽 itemChanged，不产生任何保存
+        self.list_widget.blockSignals(True)
+        for todo in self.todos:
+            self.list_widget.addItem(self.make_list_item(todo))
+        self.list_widget.blockSignals(False)
 
         # 添加按钮
         add_btn = QPushButton("添加", self.todo_window)
@@ -128,49 +483,147 @@ class Pet(QWidget):
         del_btn.setGeometry(160, 320, 130, 40)
         del_btn.clicked.connect(self.delete_todo_item)
 
-        self.todo_window.show()
+    # 为一条记录创建列表项（加入列表前设置好，不会触发 itemChanged）
+    @staticmethod
+    def make_list_item(todo):
+        item = QListWidgetItem(todo.text)
+        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(Qt.CheckState.Checked if todo.checked else Qt.CheckState.Unchecked)
+        item.setData(Qt.ItemDataRole.UserRole, todo.id)
+        return item
 
     # 添加待办事项
     def add_todo_item(self):
         text, ok = QInputDialog.getText(self, "添加待办事项", "请输入内容:")
         if ok and text.strip():
-            item = QListWidgetItem(text)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.list_widget.addItem(item)
-            self.todo_items.append((text, False))
+            todo = self.todos.add(text)
+            self.list_widget.addItem(self.make_list_item(todo))
+            # 新待办：宠物好奇地看一眼
+            self.animator.play("curious")
             self.save_todo()
 
     # 删除待办事项
     def delete_todo_item(self):
         selected_items = self.list_widget.selectedItems()
         for item in selected_items:
-            self.todo_items = [(t, c) for t, c in self.todo_items if t != item.text()]
+            self.todos.remove(item.data(Qt.ItemDataRole.UserRole))
             self.list_widget.takeItem(self.list_widget.row(item))
         self.save_todo()
 
-    # 勾选事件
+    # 勾选事件：只更新对应的那条记录
+    @profiled("todo_item_checked")
     def todo_item_checked(self, item):
-        self.todo_items = []
-        for index in range(self.list_widget.count()):
-            it = self.list_widget.item(index)
-            self.todo_items.append((it.text(), it.checkState() == Qt.CheckState.Checked))
+        checked = item.checkState() == Qt.CheckState.Checked
+        if not self.todos.set_checked(item.data(Qt.ItemDataRole.UserRole), checked):
+            return
+        if checked:
+            self.animator.play("happy")
         self.save_todo()
 
-    # 保存/读取
+    # 保存/读取：平时只追加变更，修改记录太大或退出时才重写快照
     def save_todo(self):
-        with open(TODO_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.todo_items, f, ensure_ascii=False)
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+
+    def write_todo(self):
+        changes = self.todos.take_changes()
+        if not changes and not self.needs_snapshot:
+            return
+        data = "".join(json.dumps(c, ensure_ascii=False) + "\n" for c in changes).encode("utf-8")
+        self.journal_bytes += len(data)
+        if self.journal_bytes >= JOURNAL_COMPACT_BYTES or self.needs_snapshot:
+            self.journal_bytes = 0
+            self.needs_snapshot = False
+            items = self.todos.to_list()
+            self.save_pool.start(lambda: self.run_save(self.compact_todo_files, items))
+        else:
+            self.save_pool.start(lambda: self.run_save(self.append_journal, data))
+
+    # 在保存线程中执行；出错时不让异常离开线程，交回 GUI 线程处理
+    def run_save(self, write, arg):
+        try:
+            write(arg)
+        except OSError as e:
+            self.save_failed.emit(str(e))
+
+    # 已取走的修改没写进去：稍后重写完整快照，这些修改都包含在里面
+    def on_save_failed(self, message):
+        print(f"保存失败，稍后重试: {message}")
+        self.needs_snapshot = True
+        self.save_todo()
+
+    def flush_todo(self):
+        self.save_timer.stop()
+        self.save_pool.waitForDone()
+        # 保存线程的失败通知可能还在排队，这里直接按需要重写快照处理
+        QCoreApplication.sendPostedEvents(self)
+        changes = self.todos.take_changes()
+        if self.todo_loaded and (changes or self.journal_bytes or self.needs_snapshot
+                                 or not os.path.exists(TODO_FILE)):
+            self.journal_bytes = 0
+            self.needs_snapshot = False
+            try:
+                self.compact_todo_files(self.todos.to_list())
+            except OSError as e:
+                print(f"保存失败: {e}")
+
+    @staticmethod
+    def append_journal(data):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(TODO_JOURNAL, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # 快照落盘并原子替换后才清空修改记录；中途崩溃时重放的变更与快照一致
+    @staticmethod
+    def compact_todo_files(items):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp_file = TODO_FILE + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, TODO_FILE)
+        if os.name != "nt":
+            # 替换本身也要落盘，否则断电后可能还是旧快照，而修改记录已被清空
+            fd = os.open(DATA_DIR, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        open(TODO_JOURNAL, "wb").close()
 
     def load_todo(self):
-        if os.path.exists(TODO_FILE):
-            with open(TODO_FILE, "r", encoding="utf-8") as f:
-                self.todo_items = json.load(f)
+        path = TODO_FILE
+        if not os.path.exists(path) and os.path.exists(OLD_TODO_FILE):
+            # 第一次保存时写到新位置，旧文件保留给 v1.0 迁移
+            path = OLD_TODO_FILE
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.todos.load(json.load(f))
         else:
-            self.todo_items = []
+            self.todos.load([])
+        if os.path.exists(TODO_JOURNAL):
+            with open(TODO_JOURNAL, "rb") as f:
+                for line in f:
+                    try:
+                        self.todos.apply(json.loads(line))
+                    except ValueError:
+                        # 崩溃时写了一半的最后一行：下次保存直接重写快照，不在它后面追加
+                        self.journal_bytes = JOURNAL_COMPACT_BYTES
+                        break
+                    self.journal_bytes += len(line)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    mark_startup("app")
     pet = Pet()
+    app.aboutToQuit.connect(pet.flush_todo)
+    if PROFILE:
+        watchdog = StallWatchdog(QTimer, parent=app)
+        watchdog.start()
+        app.aboutToQuit.connect(dump_profile)
     pet.show()
+    mark_startup("pet_shown")
     sys.exit(app.exec())
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import zlib
+import threading
+
+from storage import normalize_title, write_json_atomic
+
+# 已完成待办的归档（不依赖 Qt）
+#
+# archive.dat 由若干块拼接而成，每块是一段 zlib 压缩的 JSON 列表
+#   [{"title": ..., "doneAt": 时间戳, "archivedAt": 时间戳}, ...]
+# archive.idx 是 JSON 索引：每块的 [偏移, 长度, 条数]、所有归档标题的规范化形式（查重用），
+# 以及列表中已完成项第一次被看到完成的时间（决定何时归档）。
+#
+# 块只追加不改写：先写块再原子替换索引，崩溃时索引之后的残留数据会在下次写入时被覆盖。
+
+# 每块最多的条数：读取一段记录时只解压覆盖到的块
+ARCHIVE_BLOCK_SIZE = 500
+
+
+class TodoArchive:
+    """归档文件及其索引；`key in archive` 按规范化标题判断是否已归档"""
+
+    def __init__(self, data_dir):
+        self.data_file = os.path.join(data_dir, "archive.dat")
+        self.index_file = os.path.join(data_dir, "archive.idx")
+        self._blocks = []
+        self._keys = set()
+        self._done_times = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self._blocks = [tuple(block) for block in index.get("blocks", [])]
+            self._keys = set(index.get("keys", []))
+            self._done_times = index.get("doneTimes", {})
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return sum(count for _, _, count in self._blocks)
+
+    def contains(self, title):
+        """标题（未规范化）是否已归档"""
+        return normalize_title(title) in self._keys
+
+    def read(self, start, count):
+        """按归档顺序读取第 start 条起的 count 条，只解压用到的块"""
+        records = []
+        end = start + count
+        first = 0
+        with self._lock:
+            if not self._blocks:
+                return records
+            with open(self.data_file, 'rb') as f:
+                for offset, length, size in self._blocks:
+                    if first >= end:
+                        break
+                    if first + size > start:
+                        f.seek(offset)
+                        block = json.loads(zlib.decompress(f.read(length)))
+                        records += block[max(start - first, 0):end - first]
+                    first += size
+        return records
+
+    def note_done(self, title, done, when=None):
+        """记录某项变为完成（或取消完成）的时间"""
+        key = normalize_title(title)
+        if done:
+            self._done_times.setdefault(key, when if when is not None else time.time())
+        else:
+            self._done_times.pop(key, None)
+        self._dirty = True
+
+    def due(self, todos, max_age_s, now=None):
+        """返回已完成超过 max_age_s 秒的待办，并同步完成时间表
+
+        之前没记录过完成时间的已完成项从现在开始计时。
+        """
+        now = time.time() if now is None else now
+        done_times = {}
+        due = []
+        for todo in todos:
+            if not todo["done"]:
+                continue
+            key = normalize_title(todo["title"])
+            done_at = self._done_times.get(key, now)
+            done_times[key] = done_at
+            if now - done_at >= max_age_s:
+                due.append({"title": todo["title"], "doneAt": done_at})
+        if done_times != self._done_times:
+            self._done_times = done_times
+            self._dirty = True
+        return due
+
+    def append(self, todos, now=None):
+        """把待办写入归档（已归档的标题跳过），返回实际写入的条数"""
+        now = time.time() if now is None else now
+        records = []
+        for todo in todos:
+            key = normalize_title(todo["title"])
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            self._done_times.pop(key, None)
+            records.append({"title": todo["title"], "doneAt": todo.get("doneAt", now), "archivedAt": now})
+        if records:
+            self._write_blocks(records)
+        if records or self._dirty:
+            self.save()
+        return len(records)
+
+    def _write_blocks(self, records):
+        with self._lock:
+            end = self._blocks[-1][0] + self._blocks[-1][1] if self._blocks else 0
+            with open(self.data_file, 'r+b' if os.path.exists(self.data_file) else 'wb') as f:
+                f.seek(end)
+                for start in range(0, len(records), ARCHIVE_BLOCK_SIZE):
+                    block = records[start:start + ARCHIVE_BLOCK_SIZE]
+                    blob = zlib.compress(json.dumps(block, ensure_ascii=False).encode('utf-8'))
+                    self._blocks.append((end, len(blob), len(block)))
+                    f.write(blob)
+                    end += len(blob)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+    def flush(self):
+        """完成时间表有未写出的变化时写出索引（关闭列表前调用）"""
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        """写出索引（包括完成时间表）"""
+        with self._lock:
+            write_json_atomic(self.index_file, {
+                "blocks": [list(block) for block in self._blocks],
+                "keys": sorted(self._keys),
+                "doneTimes": self._done_times,
+            })
+            self._dirty = False
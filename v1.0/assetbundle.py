@@ -0,0 +1,128 @@
+"""宠物图片资源包
+
+构建时把每个表情预先缩放到一组标准尺寸（物理像素），解码成预乘 ARGB32 像素，
+连同索引打包成一个文件；运行时用 mmap 映射，直接在映射内存上构造 QImage，不解码 PNG。
+
+    python assetbundle.py            # 由 assets/pet/*.png 生成 assets/pet.bundle
+
+文件格式：
+    b"TNKB" | 版本 (u32) | 索引长度 (u32) | 索引 JSON | 像素数据（每张图按 64 字节对齐）
+索引：{"byteorder": ..., "images": {表情: [{"offset", "width", "height", "bpl"}, ...]}}，
+同一表情的各级尺寸按从小到大排列。
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage
+
+MAGIC = b"TNKB"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+ALIGN = 64
+
+# 标准尺寸（长边物理像素）：默认窗口里宠物约 300 逻辑像素，1x、2x 屏各一级。
+# 像素不压缩，每级每个表情 边长² × 4 字节，只放实际用到的尺寸
+BUNDLE_EDGES = [320, 640]
+
+
+def build_bundle(sources, path, edges=BUNDLE_EDGES):
+    """sources: {表情: 图片路径}；解码、缩放并写出资源包，返回写入的图片数"""
+    images = {}
+    blobs = []
+    offset = 0
+    for emotion, source in sources.items():
+        image = QImage(source)
+        if image.isNull():
+            print(f"跳过无法读取的图片: {source}")
+            continue
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        levels = []
+        for edge in sorted(edges):
+            if edge > max(image.width(), image.height()):
+                break  # 不放大
+            scaled = image.scaled(QSize(edge, edge), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            data = bytes(scaled.constBits())[:scaled.sizeInBytes()]
+            levels.append({"offset": offset, "width": scaled.width(), "height": scaled.height(),
+                           "bpl": scaled.bytesPerLine()})
+            padding = -len(data) % ALIGN
+            blobs.append(data + b"\0" * padding)
+            offset += len(data) + padding
+        images[emotion] = levels
+
+    index = json.dumps({"byteorder": sys.byteorder, "images": images}).encode('utf-8')
+    # 像素数据的起点也按 ALIGN 对齐
+    data_start = HEADER.size + len(index)
+    index += b" " * (-data_start % ALIGN)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return sum(len(levels) for levels in images.values())
+
+
+class AssetBundle:
+    """映射到内存的资源包；QImage 直接引用映射的内存，资源包须在图片使用期间保持打开"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不支持的资源包: {path}")
+        index = json.loads(self._map[HEADER.size:HEADER.size + index_len])
+        if index["byteorder"] != sys.byteorder:
+            raise ValueError(f"资源包字节序不符: {path}")
+        self._data_start = HEADER.size + index_len
+        self._images = index["images"]
+        self._view = memoryview(self._map)
+
+    @classmethod
+    def open(cls, path):
+        """打开资源包，不存在或无效时返回 None（开发时退回散装图片）"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            print(f"无法打开资源包 {path}: {e}")
+            return None
+
+    def __contains__(self, emotion):
+        return bool(self._images.get(emotion))
+
+    def _image(self, level):
+        start = self._data_start + level["offset"]
+        view = self._view[start:start + level["bpl"] * level["height"]]
+        return QImage(view, level["width"], level["height"], level["bpl"], QImage.Format_ARGB32_Premultiplied)
+
+    def largest(self, emotion):
+        """最大一级（作为原图使用）"""
+        return self._image(self._images[emotion][-1])
+
+    def nearest(self, emotion, box):
+        """不小于目标尺寸（按宽高比放进 box，物理像素）的最小一级，都比目标小时返回最大一级
+
+        正好是目标尺寸时可以直接绘制，否则由调用方缩小到目标尺寸，显示大小与不用资源包时相同。
+        """
+        levels = self._images[emotion]
+        largest = levels[-1]
+        target = QSize(largest["width"], largest["height"]).scaled(box, Qt.KeepAspectRatio)
+        for level in levels:
+            if level["width"] >= target.width() and level["height"] >= target.height():
+                return self._image(level)
+        return self._image(largest)
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, base_dir)
+    from test import BUNDLE_FILE, EMOTION_FILES
+    count = build_bundle(EMOTION_FILES, str(BUNDLE_FILE))
+    print(f"已写入 {count} 张图片到 {BUNDLE_FILE}")
@@ -0,0 +1,223 @@
+"""无界面性能基准
+
+在 QT_QPA_PLATFORM=offscreen 下用合成数据测量待办列表、存储和宠物绘制的热点路径，
+结果输出为 JSON，可与基准文件对比，回退超过阈值时以非零状态退出。
+
+    python bench.py --sizes 1000 10000 100000 --output result.json
+    python bench.py --save-baseline baseline.json
+    python bench.py --baseline baseline.json --threshold 0.25
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BACKENDS = ["journal", "sqlite", "json"]
+PET_SIZES = [200, 400, 800]
+
+
+def measure(func, repeat=5, setup=None):
+    """多次运行取中位数，返回毫秒"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def synthetic_todos(count):
+    """生成合成待办（约三分之一已完成）"""
+    return [{"title": f"待办事项 {i} - task {i * 7919 % 100003}", "done": i % 3 == 0}
+            for i in range(count)]
+
+
+def peak_rss_kb():
+    """进程峰值常驻内存（Linux 上 ru_maxrss 单位为 KB）"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def fresh_data_dir(backend):
+    """为某个存储后端准备一个空的临时数据目录并写入配置"""
+    from PySide6.QtCore import QStandardPaths
+    # 数据目录放到临时目录，不影响真实数据
+    os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp(prefix="todoneko-bench-")
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "config.json"), 'w', encoding='utf-8') as f:
+        json.dump({"storage": backend}, f)
+    return data_dir
+
+
+def run_size(count):
+    """在当前进程中测量某个规模，返回 {指标名: 毫秒}"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import test
+    import storage
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    app.setApplicationName("TodoNekoBench")
+    # 不迁移开发目录里的旧数据
+    test.LEGACY_TODO_FILES[:] = []
+    todos = synthetic_todos(count)
+    results = {}
+
+    # 各存储后端：加载（TodoLoader 读取并插入全部待办）与保存
+    for backend in BACKENDS:
+        data_dir = fresh_data_dir(backend)
+        seed = storage.open_storage(data_dir, storage.load_config(data_dir))
+        seed.load()
+        seed.save({"todos": todos, "lastEmotion": "normal"},
+                  [{"op": "add", "title": t["title"], "done": t["done"]} for t in todos])
+        seed.close()
+
+        window = test.MainWindow()
+        window.ensureLoaded()
+        def load_all():
+            loader = test.TodoLoader(window.todo_list, window.storage)
+            loader.start()
+            loader.finish()
+
+        results[f"load_data.{backend}"] = measure(load_all, setup=window.todo_list.clear_all)
+
+        # 保存要在完整的列表上测量（整文件存储的快照包含全部待办）
+        assert window.todo_list.count() == count, window.todo_list.count()
+        toggled = [0]
+
+        def save_one():
+            toggled[0] += 1
+            window.saveData({"op": "toggle", "title": todos[toggled[0] % count]["title"], "done": True})
+            window.save_scheduler.flush()
+
+        results[f"save_data.{backend}"] = measure(save_one)
+
+        def first_screen():
+            # 后台读取 + 插入第一屏，直到列表里出现第一行
+            loader = test.TodoLoader(window.todo_list, window.storage)
+            loader.start()
+            while window.todo_list.count() == 0:
+                app.processEvents()
+            loader.cancel()
+
+        # 最后测量：之后列表里只剩第一屏，关闭时不再保存，以免截断种子数据
+        results[f"load_first_screen.{backend}"] = measure(first_screen, setup=window.todo_list.clear_all)
+        window.storage.close()
+        window.deleteLater()
+
+    # 待办列表：逐个添加、批量添加、读取全部
+    todo_list = test.TodoListWidget()
+    results["add_todo.each"] = measure(lambda: [todo_list.add_todo(t["title"], t["done"]) for t in todos],
+                                       setup=todo_list.clear_all)
+    results["add_todos.batch"] = measure(lambda: todo_list.add_todos(todos), setup=todo_list.clear_all)
+    results["get_all_todos"] = measure(todo_list.get_all_todos)
+
+    # 滚动与重绘：每一步同步重绘视口
+    todo_list.resize(400, 600)
+    todo_list.show()
+    app.processEvents()
+    scroll_bar = todo_list.verticalScrollBar()
+    steps = 50
+
+    def scroll():
+        for i in range(steps):
+            scroll_bar.setValue(scroll_bar.maximum() * i // steps)
+            todo_list.viewport().repaint()
+
+    results["scroll_repaint.per_frame"] = round(measure(scroll) / steps, 3)
+
+    # 宠物缩放：冷缓存（需要平滑缩放）与热缓存
+    pet = test.PetWidget(resize_settle_ms=0)
+    for size in PET_SIZES:
+        pet.resize(size, size)
+
+        def cold():
+            pet.scaled_cache.clear()
+            pet.updatePixmap()
+
+        results[f"update_pixmap.{size}.cold"] = measure(cold)
+        results[f"update_pixmap.{size}.warm"] = measure(pet.updatePixmap)
+
+    return results
+
+
+def run_all(sizes):
+    """每个规模在独立子进程中运行，以便分别统计峰值内存"""
+    report = {"python": sys.version.split()[0], "platform": sys.platform, "sizes": {}}
+    for count in sizes:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(count)],
+                                check=True, capture_output=True, text=True).stdout
+        report["sizes"][str(count)] = json.loads(output.strip().splitlines()[-1])
+    return report
+
+
+def compare(report, baseline, threshold, min_delta_ms=0.5):
+    """与基准对比，返回回退列表 [(规模, 指标, 基准, 当前)]
+
+    绝对差值小于 min_delta_ms 的耗时视为噪声，不算回退。
+    """
+    regressions = []
+    for size, current in report["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for name, value in current["timings_ms"].items():
+            base_value = base["timings_ms"].get(name)
+            if base_value and value > base_value * (1 + threshold) and value - base_value >= min_delta_ms:
+                regressions.append((size, name, base_value, value))
+        base_rss = base.get("peak_rss_kb")
+        if base_rss and current["peak_rss_kb"] > base_rss * (1 + threshold):
+            regressions.append((size, "peak_rss_kb", base_rss, current["peak_rss_kb"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TodoNeko 无界面性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="合成待办数量")
+    parser.add_argument("--output", help="结果 JSON 输出文件（默认输出到终端）")
+    parser.add_argument("--baseline", help="对比的基准 JSON 文件")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的回退比例，默认 0.25")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="小于该差值（毫秒）的变化视为噪声")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基准")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        timings = run_size(args.worker)
+        print(json.dumps({"timings_ms": timings, "peak_rss_kb": peak_rss_kb()}))
+        return 0
+
+    report = run_all(args.sizes)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        for size, name, base_value, value in regressions:
+            print(f"回退: {size} 条 {name}: {base_value} -> {value}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import socket
+import stat
+import hashlib
+import contextlib
+import argparse
+
+from archive import TodoArchive
+from storage import (DEFAULT_LIST, LEGACY_TODO_FILES, LOCK_FILE, FileLock, apply_change, data_to_state,
+                     default_data_dir, list_dir, list_names, load_config, normalize_title, open_storage,
+                     state_to_data)
+
+# 无界面命令行：不导入 Qt，适合在 cron 等脚本中调用
+#
+#   test.py --cli add "买牛奶" [--done]
+#   test.py --cli done "买牛奶"
+#   test.py --cli list [--open | --done] [--json]
+#   test.py --cli --list 工作 add "写周报"        # 操作指定的列表（默认为“默认”列表）
+#
+# 界面正在运行时，通过本地套接字把变更交给界面增量应用（界面负责保存）；
+# 否则获取数据目录的文件锁后直接写存储。
+#
+# 套接字协议：每条请求和回复都是一行 JSON
+#   {"cmd": "apply", "list": 列表名, "changes": [变更记录, ...]}
+#       -> {"ok": true, "results": ["ok" | "exists" | "missing", ...]}
+#   {"cmd": "list", "list": 列表名, "done": true | false} -> {"ok": true, "todos": [...]}（省略 "done" 时列出全部）
+#   （省略 "list" 时为默认列表；界面在后台加载并修改指定的列表，不会切换当前显示的列表）
+#   {"cmd": "activate", "argv": [...], "cwd": "..."} -> {"ok": true}（再次启动窗口时转交参数）
+
+# 连接界面的超时（秒）
+SOCKET_TIMEOUT_S = 5
+# 等待回复的超时（秒）：要操作的列表不在界面的缓存中时，界面先在后台加载完再回复
+REPLY_TIMEOUT_S = 120
+# 界面未运行时等待其他命令行进程释放文件锁的时间（秒）
+LOCK_TIMEOUT_S = 10
+# 没有 $XDG_RUNTIME_DIR 时，数据目录下存放套接字的私有目录
+RUNTIME_DIR = "run"
+
+
+def server_name(data_dir):
+    """界面监听的本地套接字名（同一数据目录对应同一个名字）"""
+    digest = hashlib.sha1(os.path.abspath(data_dir).encode('utf-8')).hexdigest()[:12]
+    return f"todoneko-{digest}"
+
+
+def is_private(path):
+    """路径属于当前用户，且组和其他用户没有任何权限"""
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def runtime_dir(data_dir):
+    """存放套接字的私有目录：优先 $XDG_RUNTIME_DIR，否则数据目录下权限为 0700 的目录"""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime) and is_private(runtime):
+        return runtime
+    path = os.path.join(data_dir, RUNTIME_DIR)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"套接字目录不属于当前用户: {path}")
+    os.chmod(path, 0o700)
+    return path
+
+
+def server_path(data_dir):
+    """界面监听的 QLocalServer 路径：Unix 上是私有目录下的套接字文件，Windows 上是命名管道
+
+    不放在共享的临时目录，其他本地用户无法抢先创建同名套接字冒充界面。
+    """
+    name = server_name(data_dir)
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(runtime_dir(data_dir), name)
+
+
+def send_request(data_dir, request, timeout=SOCKET_TIMEOUT_S, reply_timeout=REPLY_TIMEOUT_S):
+    """把请求发给正在运行的界面，返回回复；界面未运行时返回 None"""
+    path = server_path(data_dir)
+    line = json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n"
+    if sys.platform == "win32":
+        try:
+            pipe = open(path, 'r+b', buffering=0)
+        except OSError:
+            return None
+        with pipe:
+            pipe.write(line)
+            return json.loads(pipe.readline())
+
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        # 不是当前用户的界面创建的，不发送任何数据
+        raise PermissionError(f"套接字不属于当前用户: {path}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        # 界面已退出，只剩下残留的套接字文件
+        sock.close()
+        return None
+    sock.settimeout(reply_timeout)
+    with sock, sock.makefile('rwb') as f:
+        f.write(line)
+        f.flush()
+        return json.loads(f.readline())
+
+
+@contextlib.contextmanager
+def locked_storage(data_dir, list_name=DEFAULT_LIST):
+    """界面未运行：持有数据目录的文件锁打开某个列表的存储"""
+    if list_name not in list_names(data_dir):
+        raise FileNotFoundError(f"列表不存在: {list_name}")
+    lock = FileLock(os.path.join(data_dir, LOCK_FILE))
+    if not lock.acquire(timeout=LOCK_TIMEOUT_S):
+        raise TimeoutError("数据正被其他进程占用")
+    try:
+        legacy_files = LEGACY_TODO_FILES if list_name == DEFAULT_LIST else ()
+        storage = open_storage(list_dir(data_dir, list_name), load_config(data_dir), legacy_files=legacy_files)
+        try:
+            yield storage
+        finally:
+            storage.close()
+    finally:
+        lock.release()
+
+
+def apply_offline(data_dir, changes, list_name=DEFAULT_LIST):
+    """直接把变更写入存储，返回每条变更的结果"""
+    with locked_storage(data_dir, list_name) as storage:
+        state = data_to_state(storage.load() or {})
+        # 已归档的标题同样算作已存在，只读归档索引
+        archive = TodoArchive(list_dir(data_dir, list_name))
+        results, applied = [], []
+        for change in changes:
+            key = normalize_title(change["title"])
+            if change["op"] == "add":
+                result = "exists" if key in state["todos"] or key in archive else "ok"
+            else:
+                result = "ok" if key in state["todos"] else "missing"
+            results.append(result)
+            if result == "ok":
+                apply_change(state, change)
+                applied.append(change)
+        if applied:
+            # 整文件存储需要完整快照，其余存储只追加这几条变更
+            data = state_to_data(state) if storage.needs_snapshot else {}
+            storage.save(data, applied)
+        return results
+
+
+def list_offline(data_dir, list_name=DEFAULT_LIST, done=None):
+    """直接读取存储中的待办，done 不为 None 时只取该完成状态的"""
+    with locked_storage(data_dir, list_name) as storage:
+        if hasattr(storage, "query"):
+            # SQLite 按 done 索引查询，不加载全部待办
+            return storage.query(done=done)
+        data = storage.load()
+    todos = data.get("todos", []) if data else []
+    if done is None:
+        return todos
+    return [todo for todo in todos if todo["done"] == done]
+
+
+def run(data_dir, request):
+    """优先交给界面处理，界面未运行时直接读写存储"""
+    try:
+        reply = send_request(data_dir, request)
+    except (OSError, ValueError):
+        reply = None
+    if reply is not None:
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "界面处理失败"))
+        return reply
+    list_name = request.get("list", DEFAULT_LIST)
+    if request["cmd"] == "list":
+        return {"ok": True, "todos": list_offline(data_dir, list_name, request.get("done"))}
+    return {"ok": True, "results": apply_offline(data_dir, request["changes"], list_name)}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="test.py --cli", description="TodoNeko 命令行")
+    parser.add_argument("--cli", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--list", dest="list_name", default=DEFAULT_LIST, metavar="NAME",
+                        help="要操作的列表（默认为“默认”列表）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="添加待办")
+    add.add_argument("titles", nargs="+", metavar="TITLE")
+    add.add_argument("--done", action="store_true", help="添加为已完成")
+
+    done = commands.add_parser("done", help="标记为已完成")
+    done.add_argument("titles", nargs="+", metavar="TITLE")
+    done.add_argument("--undo", action="store_true", help="改回未完成")
+
+    list_ = commands.add_parser("list", help="列出待办")
+    state = list_.add_mutually_exclusive_group()
+    state.add_argument("--open", dest="state", action="store_const", const=False, help="只列出未完成")
+    state.add_argument("--done", dest="state", action="store_const", const=True, help="只列出已完成")
+    list_.add_argument("--json", action="store_true", help="输出 JSONL")
+
+    args = parser.parse_args(argv)
+    data_dir = default_data_dir()
+    os.makedirs(data_dir, exist_ok=True)
+
+    if args.command == "list":
+        request = {"cmd": "list", "list": args.list_name}
+        if args.state is not None:
+            request["done"] = args.state
+    elif args.command == "add":
+        titles = [title.strip() for title in args.titles if title.strip()]
+        request = {"cmd": "apply", "list": args.list_name,
+                   "changes": [{"op": "add", "title": title, "done": args.done} for title in titles]}
+    else:
+        request = {"cmd": "apply", "list": args.list_name,
+                   "changes": [{"op": "toggle", "title": title, "done": not args.undo} for title in args.titles]}
+
+    try:
+        reply = run(data_dir, request)
+    except (OSError, RuntimeError) as e:
+        print(f"失败: {e}", file=sys.stderr)
+        return 1
+
+    if args.command == "list":
+        for todo in reply["todos"]:
+            if args.json:
+                print(json.dumps(todo, ensure_ascii=False))
+            else:
+                print(f"[{'x' if todo['done'] else ' '}] {todo['title']}")
+        return 0
+
+    messages = {"ok": "已添加" if args.command == "add" else "已更新",
+                "exists": "已存在", "missing": "未找到"}
+    for change, result in zip(request["changes"], reply["results"]):
+        print(f"{messages[result]}: {change['title']}")
+    return 0 if all(result != "missing" for result in reply["results"]) else 1
@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import time
+import bisect
+import functools
+import threading
+from collections import deque
+
+# 可选的性能分析：设置 TODONEKO_PROFILE 环境变量或带 --profile 参数启动时开启。
+# 未开启时 profiled 装饰器原样返回函数，没有任何额外开销。
+PROFILE_ENV = "TODONEKO_PROFILE"
+ENABLED = bool(os.environ.get(PROFILE_ENV)) or "--profile" in sys.argv
+
+# 事件循环卡顿阈值（毫秒）
+STALL_THRESHOLD_MS = 200
+# 直方图桶上界（毫秒），最后一个桶收集更慢的样本
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class LatencyHistogram:
+    """滚动延迟直方图：只保留最近 window 个样本"""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.total_count = 0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.total_count += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """最近样本的百分位数"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def buckets(self):
+        """最近样本按桶计数 {上界: 数量}"""
+        counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for ms in self.samples:
+            counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        labels = [f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+        return {label: count for label, count in zip(labels, counts) if count}
+
+    def summary(self):
+        return {
+            "count": self.total_count,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": self.buckets(),
+        }
+
+
+class Profiler:
+    """收集各处理函数的耗时直方图和事件循环卡顿记录"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.stalls = deque(maxlen=200)
+        self.started = time.time()
+        self._lock = threading.Lock()  # 保存在工作线程中也会记录
+
+    def record(self, name, ms):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.add(ms)
+
+    def record_stall(self, ms):
+        with self._lock:
+            self.stalls.append({"time": time.strftime("%H:%M:%S"), "ms": round(ms, 1)})
+
+    def slowest(self, count=3):
+        """按 p95 排序的最慢处理函数 [(名字, p95)]"""
+        with self._lock:
+            items = [(name, h.percentile(95)) for name, h in self.histograms.items()]
+        return sorted(items, key=lambda item: item[1], reverse=True)[:count]
+
+    def report(self):
+        with self._lock:
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "duration_s": round(time.time() - self.started, 1),
+                "handlers": {name: h.summary() for name, h in sorted(self.histograms.items())},
+                "stalls": list(self.stalls),
+            }
+
+    def dump(self, path):
+        """把统计结果写到文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+PROFILER = Profiler()
+
+
+def profiled(name):
+    """装饰器：开启性能分析时记录函数耗时"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+class StallWatchdog:
+    """事件循环卡顿检测：GUI 线程上的定时器按固定间隔触发，
+    实际间隔明显超过设定值说明事件循环被阻塞了这么久。
+
+    timer_class 为所用 Qt 绑定的 QTimer，这样本模块不依赖具体的 Qt 绑定。
+    """
+
+    def __init__(self, timer_class, interval_ms=50, threshold_ms=STALL_THRESHOLD_MS, parent=None):
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.last_tick = None
+        self.timer = timer_class(parent)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last_tick = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        now = time.perf_counter()
+        lag = (now - self.last_tick) * 1000 - self.interval_ms
+        self.last_tick = now
+        PROFILER.record("event_loop.lag", max(lag, 0.0))
+        if lag >= self.threshold_ms:
+            PROFILER.record_stall(lag)
@@ -0,0 +1,88 @@
+import time
+import heapq
+import math
+
+# 待办提醒的计划表（不依赖 Qt）
+#
+# 提醒保存在待办记录本身（"due" 到期时间戳和 "every" 重复间隔秒，0 表示只提醒一次），
+# 跟着记录一起改名、删除和保存；这里只维护按到期时间排序的内存索引。
+# 到期顺序用最小堆维护，取消或改期时不从堆里删除，而是让旧条目失效（弹出时跳过）；
+# 失效条目过多时整体重建堆。
+
+
+class ReminderSchedule:
+    """按到期时间排序的提醒计划，按待办 ID 索引"""
+
+    def __init__(self):
+        # 待办 ID -> (到期时间, 间隔)
+        self._entries = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, todo_id):
+        return todo_id in self._entries
+
+    def get(self, todo_id):
+        """某个待办的提醒 (到期时间, 间隔)，没有时返回 None"""
+        return self._entries.get(todo_id)
+
+    def _rebuild(self):
+        self._heap = [(due, todo_id) for todo_id, (due, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def schedule(self, todo_id, due, every=0):
+        """设置（或改期）提醒"""
+        self._entries[todo_id] = (due, every)
+        heapq.heappush(self._heap, (due, todo_id))
+        # 失效条目超过有效条目的两倍时重建，堆的大小保持线性
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._rebuild()
+
+    def cancel(self, todo_id):
+        """取消提醒，返回是否存在"""
+        return self._entries.pop(todo_id, None) is not None
+
+    def clear(self):
+        self._entries = {}
+        self._heap = []
+
+    def _top(self):
+        """堆顶的有效条目 (到期时间, 待办 ID)，堆为空时返回 None"""
+        while self._heap:
+            due, todo_id = self._heap[0]
+            entry = self._entries.get(todo_id)
+            if entry is not None and entry[0] == due:
+                return due, todo_id
+            heapq.heappop(self._heap)
+        return None
+
+    def next_due(self):
+        """最近的到期时间，没有提醒时返回 None"""
+        top = self._top()
+        return top[0] if top is not None else None
+
+    def pop_due(self, now=None):
+        """一次取出所有已到期的提醒，返回 [(待办 ID, 下次到期时间或 None)]
+
+        重复提醒直接跳到 now 之后的下一次（休眠错过的多次只算一次），一次性提醒被移除。
+        """
+        now = time.time() if now is None else now
+        fired = []
+        while True:
+            top = self._top()
+            if top is None or top[0] > now:
+                break
+            due, todo_id = top
+            heapq.heappop(self._heap)
+            every = self._entries[todo_id][1]
+            if every > 0:
+                missed = math.floor((now - due) / every) + 1
+                next_due = due + missed * every
+                self.schedule(todo_id, next_due, every)
+                fired.append((todo_id, next_due))
+            else:
+                del self._entries[todo_id]
+                fired.append((todo_id, None))
+        return fired
@@ -0,0 +1,842 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+# 待办数据存储后端（不依赖 Qt，命令行工具也可以直接使用）
+#
+# 变更记录格式：
+#   {"op": "add", "title": ..., "done": ...}
+#   {"op": "toggle", "title": ..., "done": ...}
+#   {"op": "delete", "title": ...}
+#   {"op": "rename", "title": 旧标题, "new": 新标题}
+#   {"op": "remind", "title": ..., "due": 到期时间戳（None 表示取消提醒）, "every": 重复间隔秒（0 表示一次）}
+#   {"op": "emotion", "value": ...}
+#   {"op": "clear"}
+
+# 应用信息：决定数据目录位置（与 QStandardPaths.AppDataLocation 一致）
+APP_NAME = "桌面宠物待办事项"
+ORGANIZATION_NAME = "个人使用"
+
+# v0.0 的应用名（数据目录为 AppDataLocation/TodoNeko）
+V0_APP_NAME = "TodoNeko"
+
+
+def generic_data_dir():
+    """不依赖 Qt 计算用户数据根目录，规则与 QStandardPaths.GenericDataLocation 相同"""
+    if sys.platform == "win32":
+        return os.environ.get("APPDATA") or os.path.expanduser("~/AppData/Roaming")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support")
+    return os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+
+
+def default_data_dir():
+    """不依赖 Qt 计算数据目录，规则与 QStandardPaths.AppDataLocation 相同"""
+    return os.path.join(generic_data_dir(), ORGANIZATION_NAME, APP_NAME)
+
+
+# 首次启动时自动迁移的 v0.0 数据：新版 v0.0 写在它自己的数据目录，
+# 旧版写在启动时的工作目录（即 v0.0 目录）。不读取当前工作目录下的 todo.json，
+# 以免把无关的文件当成待办导入
+LEGACY_TODO_FILES = [
+    Path(generic_data_dir()) / V0_APP_NAME / "todo.json",
+    Path(__file__).resolve().parent.parent / "v0.0" / "todo.json",
+]
+
+# 跨进程锁文件：界面运行期间持有，命令行直接写数据前也要获取
+LOCK_FILE = "todoneko.lock"
+
+# 命名列表：默认列表就是数据目录本身（兼容之前的数据），其他列表各占 lists/<名称>/ 子目录，
+# 各自有独立的存储、归档和提醒计划；lists.json 记录上次打开的列表
+DEFAULT_LIST = "默认"
+LISTS_DIR = "lists"
+LISTS_STATE_FILE = "lists.json"
+
+# 列表名要能直接作为目录名
+_INVALID_LIST_NAME_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# 日志超过该大小后在后台压缩成快照
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+# 默认配置（数据目录下的 config.json 可以覆盖）
+DEFAULT_CONFIG = {
+    "storage": "journal",  # journal / sqlite / json
+    "save_delay_ms": 500,
+    "archive_after_days": 7,  # 完成多少天后移到归档，0 表示不归档
+}
+
+
+def load_config(data_dir):
+    """读取数据目录下的 config.json，缺失的项使用默认值"""
+    config = dict(DEFAULT_CONFIG)
+    path = os.path.join(data_dir, "config.json")
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"配置文件无效，使用默认配置: {e}")
+    return config
+
+
+def normalize_title(title):
+    """规范化标题用于查重：合并空白并忽略大小写"""
+    return " ".join(title.split()).casefold()
+
+
+def new_state():
+    """空的内存状态：规范化标题 -> 待办（保持插入顺序）"""
+    return {"todos": {}, "lastEmotion": "normal"}
+
+
+def apply_change(state, change):
+    """把一条变更记录应用到内存状态"""
+    todos = state["todos"]
+    op = change.get("op")
+    if op == "add":
+        key = normalize_title(change["title"])
+        if key and key not in todos:
+            todos[key] = {"title": change["title"], "done": bool(change.get("done", False))}
+    elif op == "toggle":
+        todo = todos.get(normalize_title(change["title"]))
+        if todo is not None:
+            todo["done"] = bool(change["done"])
+    elif op == "delete":
+        todos.pop(normalize_title(change["title"]), None)
+    elif op == "remind":
+        todo = todos.get(normalize_title(change["title"]))
+        if todo is not None:
+            set_reminder(todo, change.get("due"), change.get("every", 0))
+    elif op == "rename":
+        old_key = normalize_title(change["title"])
+        new_key = normalize_title(change["new"])
+        todo = todos.get(old_key)
+        if todo is None or (new_key != old_key and new_key in todos):
+            return
+        # 保持原来的位置
+        state["todos"] = {
+            (new_key if key == old_key else key): value
+            for key, value in todos.items()
+        }
+        todo["title"] = change["new"]
+    elif op == "emotion":
+        state["lastEmotion"] = change["value"]
+    elif op == "clear":
+        todos.clear()
+
+
+def set_reminder(todo, due, every=0):
+    """在待办字典里设置提醒（due 为 None 时去掉），没有提醒的待办不带这两个字段"""
+    if due is None:
+        todo.pop("due", None)
+        todo.pop("every", None)
+    else:
+        todo["due"] = due
+        todo["every"] = int(every or 0)
+
+
+def remind_change(todo):
+    """待办字典当前的提醒对应的变更记录"""
+    return {"op": "remind", "title": todo["title"], "due": todo.get("due"), "every": todo.get("every", 0)}
+
+
+def state_to_data(state):
+    """内存状态 -> load() 返回的数据格式"""
+    return {
+        "todos": [dict(todo) for todo in state["todos"].values()],
+        "lastEmotion": state["lastEmotion"],
+    }
+
+
+def diff_states(old, new):
+    """比较两份内存状态，返回把 old 变成 new 的变更记录（新增项追加在末尾）"""
+    changes = []
+    old_todos, new_todos = old["todos"], new["todos"]
+    for key, todo in old_todos.items():
+        if key not in new_todos:
+            changes.append({"op": "delete", "title": todo["title"]})
+    for key, todo in new_todos.items():
+        old_todo = old_todos.get(key)
+        if old_todo is None:
+            changes.append({"op": "add", "title": todo["title"], "done": todo["done"]})
+            if "due" in todo:
+                changes.append(remind_change(todo))
+            continue
+        if old_todo["title"] != todo["title"]:
+            # 只有空白或大小写不同
+            changes.append({"op": "rename", "title": old_todo["title"], "new": todo["title"]})
+        if old_todo["done"] != todo["done"]:
+            changes.append({"op": "toggle", "title": todo["title"], "done": todo["done"]})
+        if (old_todo.get("due"), old_todo.get("every", 0)) != (todo.get("due"), todo.get("every", 0)):
+            changes.append(remind_change(todo))
+    if old["lastEmotion"] != new["lastEmotion"]:
+        changes.append({"op": "emotion", "value": new["lastEmotion"]})
+    return changes
+
+
+def file_signature(path):
+    """文件的 (mtime, 大小, inode)，不存在时为 None；用于判断文件是否被别的进程替换或修改"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def data_to_state(data):
+    """load() 数据格式 -> 内存状态（重复项只保留第一个）"""
+    state = new_state()
+    for todo in data.get("todos", []):
+        apply_change(state, {"op": "add", "title": todo["title"], "done": todo.get("done", False)})
+        if todo.get("due") is not None:
+            apply_change(state, remind_change(todo))
+    state["lastEmotion"] = data.get("lastEmotion", "normal")
+    return state
+
+
+def read_legacy(path):
+    """读取旧版数据文件：v1.0 的 data.json 或 v0.0 的 todo.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        # v0.0 格式: [[标题, 是否完成], ...]，新版 v0.0 在第三列存 ID
+        for row in data:
+            if not isinstance(row, (list, tuple)) or len(row) < 2 or not isinstance(row[0], str):
+                raise ValueError(f"不是 v0.0 的待办格式: {row!r}")
+        return {"todos": [{"title": row[0], "done": bool(row[1])} for row in data]}
+    if not isinstance(data, dict):
+        raise ValueError("不是待办数据文件")
+    return data
+
+
+def migrate_legacy(paths):
+    """合并旧数据文件（data.json / todo.json）为内存状态，一个都没有时返回 None"""
+    state = new_state()
+    found = False
+    seen = set()
+    for path in paths:
+        real_path = os.path.realpath(path)
+        if real_path in seen or not os.path.isfile(path):
+            continue
+        seen.add(real_path)
+        try:
+            data = read_legacy(path)
+            # 先检查完整个文件，格式不对时一项都不导入
+            changes = [{"op": "add", "title": str(todo["title"]), "done": bool(todo.get("done", False))}
+                       for todo in data.get("todos", [])]
+        except (OSError, ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+            print(f"迁移失败: {path}: {e}")
+            continue
+        for change in changes:
+            apply_change(state, change)
+        if "lastEmotion" in data:
+            state["lastEmotion"] = data["lastEmotion"]
+        found = True
+    return state if found else None
+
+
+def _fsync_dir(path):
+    """同步目录项，保证 rename 落盘（Windows 上不支持，忽略）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path, data, indent=None):
+    """先写临时文件再替换，避免写到一半损坏数据文件"""
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+class FileLock:
+    """跨进程文件锁（Unix 用 flock，Windows 用 msvcrt），进程退出时由系统自动释放"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, timeout=None):
+        """获取锁；timeout 为 None 时一直等待，为 0 时只尝试一次。返回是否成功"""
+        if self._file is not None:
+            return True
+        f = open(self.path, 'a+b')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                self._lock(f)
+                self._file = f
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    f.close()
+                    return False
+                time.sleep(0.05)
+
+    @staticmethod
+    def _lock(f):
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def release(self):
+        if self._file is None:
+            return
+        if sys.platform == "win32":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class JsonStorage:
+    """整文件 JSON 存储：每次保存重写 data.json
+
+    为了找出其他进程的修改，会保留最近一次加载或保存的数据。
+    """
+    # 保存时需要完整的数据快照
+    needs_snapshot = True
+
+    def __init__(self, data_dir):
+        self.data_file = os.path.join(data_dir, "data.json")
+        self._data = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载数据，文件不存在时返回 None"""
+        with self._lock:
+            if not os.path.exists(self.data_file):
+                return None
+            self._data = read_legacy(self.data_file)
+            self._signature = file_signature(self.data_file)
+            return self._data
+
+    def save(self, data, changes):
+        """保存完整快照，变更记录不需要"""
+        with self._lock:
+            write_json_atomic(self.data_file, data, indent=2)
+            self._data = data
+            self._signature = file_signature(self.data_file)
+
+    def watch_paths(self):
+        return [self.data_file]
+
+    def poll(self):
+        """data.json 被其他进程改写时，返回相对上次加载/保存的变更记录"""
+        with self._lock:
+            signature = file_signature(self.data_file)
+            if signature is None or signature == self._signature:
+                return []
+            try:
+                data = read_legacy(self.data_file)
+            except (OSError, ValueError):
+                return []  # 可能正写到一半，等下一次通知
+            old = data_to_state(self._data or {})
+            self._data = data
+            self._signature = signature
+            return diff_states(old, data_to_state(data))
+
+    def close(self):
+        pass
+
+
+class JournalStorage:
+    """追加式日志存储：快照文件 + 变更日志
+
+    每次保存只把这一批变更追加到日志并 fsync 一次；日志超过阈值后
+    （在保存线程中）压缩成新快照。启动时加载快照并重放日志。
+    """
+    needs_snapshot = False
+
+    def __init__(self, data_dir, legacy_files=(), compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.data_dir = data_dir
+        self.snapshot_file = os.path.join(data_dir, "data.snapshot.json")
+        self.journal_file = os.path.join(data_dir, "data.journal")
+        self.legacy_files = [os.path.join(data_dir, "data.json")] + [str(p) for p in legacy_files]
+        self.compact_bytes = compact_bytes
+
+        self._state = new_state()
+        self._seq = 0
+        self._journal = None
+        # 日志中已读取（或由本进程写入）的字节数，其他进程追加的内容从这里开始读
+        self._offset = 0
+        self._snapshot_signature = None
+        # 保存前读到的其他进程的变更，等 poll 取走
+        self._external = []
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载快照并重放日志；首次使用时迁移旧数据。没有任何数据时返回 None"""
+        with self._lock:
+            self._external = []
+            if not self._load_all():
+                return None
+            return state_to_data(self._state)
+
+    def _load_all(self):
+        self._state = new_state()
+        self._seq = 0
+        self._offset = 0
+        if os.path.exists(self.snapshot_file):
+            self._load_snapshot()
+        elif not os.path.exists(self.journal_file):
+            if not self._migrate():
+                return False
+        self._replay_journal()
+        return True
+
+    def _load_snapshot(self):
+        with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        self._state = data_to_state(snapshot)
+        self._seq = snapshot.get("seq", 0)
+        self._snapshot_signature = file_signature(self.snapshot_file)
+
+    def _migrate(self):
+        """把 data.json 和 v0.0 的 todo.json 合并成第一份快照"""
+        state = migrate_legacy(self.legacy_files)
+        if state is None:
+            return False
+        self._state = state
+        self._write_snapshot()
+        return True
+
+    def _replay_journal(self):
+        """从 _offset 开始读取日志并应用，返回新应用的变更记录"""
+        applied = []
+        if not os.path.exists(self.journal_file):
+            return applied
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 其他进程正写到一半，下次再读
+                self._offset += len(line)
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    # 崩溃时写了一半的记录被之后的追加接上了换行：跳过这一行，后面的记录照常读取
+                    continue
+                if change.get("seq", 0) <= self._seq:
+                    continue  # 已包含在快照中
+                apply_change(self._state, change)
+                self._seq = change["seq"]
+                applied.append(change)
+        return applied
+
+    def _write_snapshot(self):
+        data = state_to_data(self._state)
+        data["seq"] = self._seq
+        write_json_atomic(self.snapshot_file, data)
+        self._snapshot_signature = file_signature(self.snapshot_file)
+
+    def watch_paths(self):
+        return [self.snapshot_file, self.journal_file]
+
+    def poll(self):
+        """读取其他进程追加的日志；对方压缩过日志时重新加载并比较差异"""
+        with self._lock:
+            changes, self._external = self._external, []
+            return changes + self._read_external()
+
+    def _read_external(self):
+        snapshot_replaced = file_signature(self.snapshot_file) != self._snapshot_signature
+        try:
+            journal_size = os.path.getsize(self.journal_file)
+        except OSError:
+            journal_size = 0
+        if not snapshot_replaced and journal_size >= self._offset:
+            # 通常情况：只读日志末尾新增的部分
+            return self._replay_journal()
+        old = self._state
+        try:
+            self._load_all()
+        except (OSError, ValueError):
+            self._state = old
+            return []
+        return diff_states(old, self._state)
+
+    def save(self, data, changes):
+        """追加一批变更记录，整批只 fsync 一次"""
+        with self._lock:
+            changes = list(changes)
+            emotion = data.get("lastEmotion")
+            if emotion is not None and emotion != self._state["lastEmotion"]:
+                changes.append({"op": "emotion", "value": emotion})
+            if not changes:
+                return
+
+            # 先读入其他进程追加的记录，保证序号连续
+            self._external += self._read_external()
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'ab')
+            if os.fstat(self._journal.fileno()).st_size > self._offset:
+                # 已读到的位置之后只剩崩溃时写了一半的记录（数据目录有锁，没有其他写入方），
+                # 截掉后再追加，否则新记录会接在半行后面一起无法读取
+                self._journal.truncate(self._offset)
+            lines = []
+            for change in changes:
+                self._seq += 1
+                record = dict(change, seq=self._seq)
+                apply_change(self._state, record)
+                lines.append(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+            self._journal.write(b"".join(lines))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._offset = self._journal.tell()
+
+            if self._journal.tell() >= self.compact_bytes:
+                self._compact()
+
+    def _compact(self):
+        """把当前状态写成快照并清空日志"""
+        self._write_snapshot()
+        self._journal.close()
+        open(self.journal_file, 'wb').close()
+        self._journal = open(self.journal_file, 'ab')
+        self._offset = 0
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SqliteStorage:
+    """SQLite 存储：WAL 模式，按规范化标题和完成状态建索引
+
+    变更记录按相同操作分组，用预编译语句 executemany 批量执行，
+    一批变更在同一个事务中提交。触发器把每次修改记进 change_log，
+    其他进程的修改通过 data_version 发现、从 change_log 增量读取。
+    """
+    needs_snapshot = False
+
+    # change_log 保留的行数，落后更多的读取方需要整体重新加载
+    CHANGE_LOG_KEEP = 10000
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS todos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            norm TEXT NOT NULL UNIQUE,
+            done INTEGER NOT NULL DEFAULT 0,
+            due REAL,
+            every INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_todos_done ON todos(done);
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            title TEXT,
+            new TEXT,
+            done INTEGER,
+            due REAL,
+            every INTEGER
+        );
+        CREATE TRIGGER IF NOT EXISTS log_add AFTER INSERT ON todos BEGIN
+            INSERT INTO change_log (op, title, done) VALUES ('add', NEW.title, NEW.done);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_delete AFTER DELETE ON todos BEGIN
+            INSERT INTO change_log (op, title) VALUES ('delete', OLD.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_rename AFTER UPDATE OF title ON todos
+        WHEN OLD.title != NEW.title BEGIN
+            INSERT INTO change_log (op, title, new) VALUES ('rename', OLD.title, NEW.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_toggle AFTER UPDATE OF done ON todos
+        WHEN OLD.done != NEW.done BEGIN
+            INSERT INTO change_log (op, title, done) VALUES ('toggle', NEW.title, NEW.done);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_remind AFTER UPDATE OF due, every ON todos
+        WHEN OLD.due IS NOT NEW.due OR OLD.every != NEW.every BEGIN
+            INSERT INTO change_log (op, title, due, every) VALUES ('remind', NEW.title, NEW.due, NEW.every);
+        END;
+        CREATE TRIGGER IF NOT EXISTS log_emotion AFTER INSERT ON app_state
+        WHEN NEW.key = 'lastEmotion' BEGIN
+            INSERT INTO change_log (op, new) VALUES ('emotion', NEW.value);
+        END;
+    """
+
+    # 操作 -> (SQL, 参数提取函数)
+    STATEMENTS = {
+        "add": ("INSERT OR IGNORE INTO todos (title, norm, done) VALUES (?, ?, ?)",
+                lambda c: (c["title"], normalize_title(c["title"]), int(bool(c.get("done", False))))),
+        "toggle": ("UPDATE todos SET done = ? WHERE norm = ?",
+                   lambda c: (int(bool(c["done"])), normalize_title(c["title"]))),
+        "remind": ("UPDATE todos SET due = ?, every = ? WHERE norm = ?",
+                   lambda c: (c.get("due"), int(c.get("every") or 0) if c.get("due") is not None else 0,
+                              normalize_title(c["title"]))),
+        "delete": ("DELETE FROM todos WHERE norm = ?",
+                   lambda c: (normalize_title(c["title"]),)),
+        "rename": ("UPDATE OR IGNORE todos SET title = ?, norm = ? WHERE norm = ?",
+                   lambda c: (c["new"], normalize_title(c["new"]), normalize_title(c["title"]))),
+        "emotion": ("INSERT OR REPLACE INTO app_state (key, value) VALUES ('lastEmotion', ?)",
+                    lambda c: (c["value"],)),
+        "clear": ("DELETE FROM todos", lambda c: ()),
+    }
+
+    def __init__(self, data_dir, legacy_files=()):
+        self.data_dir = data_dir
+        self.db_file = os.path.join(data_dir, "todo.db")
+        self.legacy_files = [str(p) for p in legacy_files]
+        self._lock = threading.Lock()
+        # 只有选用 SQLite 时才导入，不拖慢默认启动
+        import sqlite3
+        is_new = not os.path.exists(self.db_file)
+        # 保存在工作线程进行，由锁保证同一时间只有一个线程使用连接
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._emotion = None
+        self._log_seq = 0
+        self._data_version = None
+        # 保存前读到的其他进程的变更，等 poll 取走（None 表示需要整体重新加载）
+        self._external = []
+        if is_new:
+            self._migrate()
+        self._log_seq = self._last_log_seq()
+        self._data_version = self._data_version()
+        self._external = []
+
+    def _migrate(self):
+        """新建数据库时导入日志存储或旧版 JSON 数据"""
+        journal = JournalStorage(self.data_dir, legacy_files=self.legacy_files)
+        if os.path.exists(journal.snapshot_file) or os.path.exists(journal.journal_file):
+            data = journal.load()
+            journal.close()
+        else:
+            state = migrate_legacy(journal.legacy_files)
+            data = state_to_data(state) if state is not None else None
+        if data is None:
+            return
+        changes = [{"op": "add", "title": todo["title"], "done": todo["done"]} for todo in data["todos"]]
+        changes += [remind_change(todo) for todo in data["todos"] if todo.get("due") is not None]
+        changes.append({"op": "emotion", "value": data.get("lastEmotion", "normal")})
+        self._execute(changes)
+
+    def load(self):
+        """加载所有待办，数据库为空时返回 None"""
+        with self._lock:
+            todos = []
+            for title, done, due, every in self._conn.execute("SELECT title, done, due, every FROM todos ORDER BY id"):
+                todo = {"title": title, "done": bool(done)}
+                set_reminder(todo, due, every)
+                todos.append(todo)
+            row = self._conn.execute("SELECT value FROM app_state WHERE key = 'lastEmotion'").fetchone()
+        if not todos and row is None:
+            return None
+        self._emotion = row[0] if row else "normal"
+        return {"todos": todos, "lastEmotion": self._emotion}
+
+    def query(self, done=None, limit=-1, offset=0):
+        """按完成状态查询（走 done 索引），不需要加载全部数据"""
+        sql = "SELECT title, done, due, every FROM todos"
+        params = []
+        if done is not None:
+            sql += " WHERE done = ?"
+            params.append(int(bool(done)))
+        sql += " ORDER BY id LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        todos = []
+        with self._lock:
+            for title, d, due, every in self._conn.execute(sql, params):
+                todo = {"title": title, "done": bool(d)}
+                set_reminder(todo, due, every)
+                todos.append(todo)
+        return todos
+
+    def count(self, done=None):
+        """按完成状态计数"""
+        with self._lock:
+            if done is None:
+                return self._conn.execute("SELECT COUNT(*) FROM todos").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM todos WHERE done = ?",
+                                      (int(bool(done)),)).fetchone()[0]
+
+    def _last_log_seq(self):
+        return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_log(self):
+        """读取本进程尚未见过的 change_log 记录；中间有记录已被清理时返回 None"""
+        oldest = self._conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+        if oldest is not None and oldest > self._log_seq + 1:
+            self._log_seq = self._last_log_seq()
+            return None
+        changes = []
+        for seq, op, title, new, done, due, every in self._conn.execute(
+                "SELECT seq, op, title, new, done, due, every FROM change_log WHERE seq > ? ORDER BY seq",
+                (self._log_seq,)):
+            if op == "add" or op == "toggle":
+                changes.append({"op": op, "title": title, "done": bool(done)})
+            elif op == "delete":
+                changes.append({"op": op, "title": title})
+            elif op == "rename":
+                changes.append({"op": op, "title": title, "new": new})
+            elif op == "remind":
+                changes.append({"op": op, "title": title, "due": due, "every": every or 0})
+            elif op == "emotion":
+                changes.append({"op": op, "value": new})
+                self._emotion = new
+            self._log_seq = seq
+        return changes
+
+    def watch_paths(self):
+        # WAL 模式下提交写在 -wal 文件里
+        return [self.db_file, self.db_file + "-wal"]
+
+    def poll(self):
+        """其他进程提交过修改时返回这些变更记录；落后太多时返回 None，需要整体重新加载"""
+        with self._lock:
+            self._check_external()
+            external, self._external = self._external, []
+            return external
+
+    def _check_external(self):
+        """data_version 变化说明其他连接提交过修改，把这些修改记下来"""
+        data_version = self._data_version()
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        changes = self._read_log()
+        if changes is None:
+            self._external = None
+        elif self._external is not None:
+            self._external += changes
+
+    def save(self, data, changes):
+        """把一批变更记录写进一个事务"""
+        changes = list(changes)
+        emotion = data.get("lastEmotion")
+        if emotion is not None and emotion != self._emotion:
+            changes.append({"op": "emotion", "value": emotion})
+        if changes:
+            self._execute(changes)
+
+    def _execute(self, changes):
+        with self._lock, self._conn:
+            # 先读入其他进程的修改，再写本批；写完后本批产生的日志不再当作外部修改
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._check_external()
+            # 相邻的同类操作合并成一次 executemany，保持整体顺序
+            run_op, run_params = None, []
+            for change in changes:
+                op = change["op"]
+                if op not in self.STATEMENTS:
+                    continue
+                if op != run_op and run_params:
+                    self._conn.executemany(self.STATEMENTS[run_op][0], run_params)
+                    run_params = []
+                run_op = op
+                run_params.append(self.STATEMENTS[op][1](change))
+                if op == "emotion":
+                    self._emotion = change["value"]
+            if run_params:
+                self._conn.executemany(self.STATEMENTS[run_op][0], run_params)
+            self._log_seq = self._last_log_seq()
+            if self._log_seq > self.CHANGE_LOG_KEEP:
+                self._conn.execute("DELETE FROM change_log WHERE seq <= ?", (self._log_seq - self.CHANGE_LOG_KEEP,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+STORAGE_BACKENDS = {
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+    "json": JsonStorage,
+}
+
+
+def open_storage(data_dir, config, legacy_files=()):
+    """按配置创建存储后端"""
+    name = config.get("storage", DEFAULT_CONFIG["storage"])
+    if name not in STORAGE_BACKENDS:
+        print(f"未知的存储类型 {name!r}，使用 {DEFAULT_CONFIG['storage']}")
+        name = DEFAULT_CONFIG["storage"]
+    if name == "json":
+        return JsonStorage(data_dir)
+    return STORAGE_BACKENDS[name](data_dir, legacy_files=legacy_files)
+
+
+def list_dir(data_dir, name):
+    """列表的数据目录"""
+    if name == DEFAULT_LIST:
+        return data_dir
+    return os.path.join(data_dir, LISTS_DIR, name)
+
+
+def list_names(data_dir):
+    """所有列表名，默认列表在最前，其余按名称排序"""
+    root = os.path.join(data_dir, LISTS_DIR)
+    if not os.path.isdir(root):
+        return [DEFAULT_LIST]
+    names = sorted(entry.name for entry in os.scandir(root) if entry.is_dir() and entry.name != DEFAULT_LIST)
+    return [DEFAULT_LIST] + names
+
+
+def create_list(data_dir, name):
+    """新建列表目录，返回去掉首尾空白的列表名；名称无效或已存在时抛出 ValueError"""
+    name = name.strip()
+    if not name or name.endswith(".") or _INVALID_LIST_NAME_RE.search(name):
+        raise ValueError(f"无效的列表名: {name!r}")
+    # 大小写不敏感的文件系统上只差大小写的两个目录会冲突
+    if normalize_title(name) in {normalize_title(existing) for existing in list_names(data_dir)}:
+        raise ValueError(f"列表已存在: {name}")
+    os.makedirs(list_dir(data_dir, name))
+    return name
+
+
+def load_active_list(data_dir):
+    """上次打开的列表，记录缺失或列表已不存在时返回默认列表"""
+    try:
+        with open(os.path.join(data_dir, LISTS_STATE_FILE), 'r', encoding='utf-8') as f:
+            name = json.load(f)["active"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return DEFAULT_LIST
+    return name if name in list_names(data_dir) else DEFAULT_LIST
+
+
+def save_active_list(data_dir, name):
+    """记录当前打开的列表"""
+    write_json_atomic(os.path.join(data_dir, LISTS_STATE_FILE), {"active": name})
@@ -1,18 +1,47 @@
 import os
-import json
+import re
 import sys
+import argparse
+import json
+import time
+import bisect
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+# 启动计时起点
+_IMPORT_START = time.perf_counter()
+
 # 获取当前脚本所在目录
 BASE_DIR = Path(__file__).resolve().parent
 
-# 兼容导入PySide6
-from PySide6 import QtCore, QtGui, QtWidgets
+# 命令行模式（--cli）不导入 Qt：直接读写存储，或交给正在运行的界面
+if __name__ == "__main__" and "--cli" in sys.argv[1:]:
+    import cli
+    sys.exit(cli.main(sys.argv[1:]))
+
+# 兼容导入PySide6（只导入用到的模块）
+from PySide6 import QtCore, QtGui
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                                  QLabel, QLineEdit, QPushButton, QComboBox, QListWidget,
-                                  QListWidgetItem, QCheckBox, QToolButton, QStatusBar, QMessageBox)
+                                  QLabel, QLineEdit, QPushButton, QComboBox, QListView, QListWidget,
+                                  QDialog, QAbstractItemView, QStyledItemDelegate, QStyleOptionViewItem,
+                                  QStyleOptionButton, QStyle, QStatusBar, QProgressBar, QFileDialog,
+                                  QInputDialog, QMenu, QFormLayout, QDateTimeEdit, QDialogButtonBox)
 from PySide6.QtGui import QPixmap, QPainter, QPalette, QColor
+from PySide6.QtNetwork import QLocalServer
+
+from profiling import ENABLED as PROFILING_ENABLED, PROFILER, StallWatchdog, profiled
+from storage import (APP_NAME, DEFAULT_LIST, LEGACY_TODO_FILES, LOCK_FILE, ORGANIZATION_NAME, FileLock,
+                     create_list, list_dir, list_names, load_active_list, load_config, normalize_title,
+                     open_storage, save_active_list)
+from cli import send_request, server_path
+from archive import TodoArchive
+from assetbundle import AssetBundle
+from reminders import ReminderSchedule
+from todos import TodoStore
+from transfer import IMPORT_CHUNK_SIZE, TodoReader, TodoWriter, iter_chunks
+import transfer
 
 # 启用高DPI支持
 if hasattr(Qt, 'AA_EnableHighDpiScaling'):
@@ -28,46 +57,204 @@ EMOTION_FILES = {
     "blink": str(BASE_DIR / "assets" / "pet" / "wink.png"),
 }
 
+# 预缩放的资源包（python assetbundle.py 生成，打包时代替散装图片）；不存在时读取上面的 PNG
+BUNDLE_FILE = BASE_DIR / "assets" / "pet.bundle"
+
+
+# 表情图片缓存上限（字节）：原图按需解码，缩放结果按 (表情, 尺寸, 像素比) 缓存
+PET_SOURCE_CACHE_BYTES = 24 * 1024 * 1024
+PET_SCALED_CACHE_BYTES = 16 * 1024 * 1024
+
+# 调整窗口大小时，尺寸停止变化多久（毫秒）后再做一次平滑缩放；0 表示每次都平滑缩放
+PET_RESIZE_SETTLE_MS = 150
+
+# 保存合并窗口（毫秒）：窗口内的多次修改只写一次盘，可在 config.json 中用 save_delay_ms 覆盖
+SAVE_DELAY_MS = 500
+
+# 启动时等待命令行进程释放数据目录锁的时间（秒）
+LOCK_WAIT_S = 2
+
+# 数据文件变化后等待多久再读取（毫秒），合并一次保存引起的多个通知
+WATCH_DELAY_MS = 200
+
+# 启动加载：数据在工作线程读取，先插入第一屏，其余每轮事件循环插入一批
+LOAD_FIRST_SCREEN_ROWS = 100
+LOAD_BATCH_ROWS = 2000
+
+# 归档：每隔多久（毫秒）检查一次完成已久的待办；历史记录每页显示的条数
+ARCHIVE_INTERVAL_MS = 60 * 60 * 1000
+HISTORY_PAGE_SIZE = 100
+
+# 已加载列表的缓存：除当前列表外最多保留几个，以及所有已加载列表的待办总数上限，
+# 超出时卸载最久没用的列表（切回时重新加载）
+LIST_CACHE_SIZE = 3
+LIST_CACHE_MAX_TODOS = 200000
+
+# 设置该环境变量后把启动各阶段耗时打印到终端（每次启动都会追加到数据目录的 startup.jsonl）
+STARTUP_TIMINGS_ENV = "TODONEKO_STARTUP_TIMINGS"
+# startup.jsonl 只保留最近这么多次启动
+STARTUP_LOG_KEEP = 100
+
+# 搜索防抖：待办数超过阈值时，输入停顿这么久（毫秒）才过滤
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_DEBOUNCE_THRESHOLD = 5000
+# 大列表上只输入了一个字母或数字时（几乎匹配所有项，通常还会继续输入）等得更久
+SEARCH_SHORT_QUERY_DEBOUNCE_MS = 400
+# 加载完成后在空闲时建立搜索索引，每轮事件循环加入的标题数
+SEARCH_INDEX_BATCH = 2000
+
+# 搜索分词：连续的字母数字算一个词，中日韩文字和其他符号逐字切分
+TOKEN_RE = re.compile(r"[^\W\u2e80-\u9fff\u3040-\u30ff\uac00-\ud7af]+|\S")
+
+# 过滤状态
+FILTER_ALL = "all"
+FILTER_OPEN = "open"
+FILTER_DONE = "done"
 
 # 默认模板
 DEFAULT_TEMPLATES = ["喝水", "休息眼睛", "站起来活动一下", "查看日程"]
+# 模板的重复提醒间隔（分钟）：从模板添加的待办按这个间隔重复提醒
+TEMPLATE_REPEAT_MINUTES = {"喝水": 60, "休息眼睛": 20, "站起来活动一下": 45, "查看日程": 24 * 60}
+
+# 提醒：QTimer 按单调时钟计时，系统休眠期间可能停走，最多等这么久（毫秒）就按当前时间重新检查
+REMINDER_MAX_SLEEP_MS = 5 * 60 * 1000
+# 提醒到期时宠物显示好奇表情的时长（毫秒）
+REMINDER_EMOTION_MS = 3000
+# 设置提醒时可选的重复间隔（秒）
+REMINDER_REPEAT_CHOICES = [("不重复", 0), ("每小时", 3600), ("每天", 24 * 3600), ("每周", 7 * 24 * 3600)]
+
+class StartupTimer:
+    """启动阶段计时，用于跟踪冷启动耗时"""
+    
+    def __init__(self, start):
+        self.start = start
+        self.phases = {}
+    
+    def mark(self, phase):
+        """记录某阶段完成时距启动的毫秒数（只记第一次）"""
+        if phase not in self.phases:
+            self.phases[phase] = round((time.perf_counter() - self.start) * 1000, 2)
+    
+    def save(self, path, keep=STARTUP_LOG_KEEP):
+        """追加一条记录到 JSON Lines 文件，只保留最近 keep 条"""
+        record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "phases": self.phases}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()[-(keep - 1):] if keep > 1 else []
+        except FileNotFoundError:
+            lines = []
+        lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(tmp_file, path)
+        if os.environ.get(STARTUP_TIMINGS_ENV):
+            print("启动耗时(ms): " + ", ".join(f"{k}={v}" for k, v in self.phases.items()))
+
+STARTUP = StartupTimer(_IMPORT_START)
+STARTUP.mark("imports")
+
+class PixmapCache:
+    """按字节数限制大小的 LRU 图片缓存"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items = OrderedDict()
+    
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    
+    def get(self, key):
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+    
+    def put(self, key, pixmap):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.total_bytes -= self.cost(old)
+        self._items[key] = pixmap
+        self.total_bytes += self.cost(pixmap)
+        # 淘汰最久未使用的，至少保留刚放入的这一张
+        while self.total_bytes > self.max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.total_bytes -= self.cost(evicted)
+    
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+_PET_BUNDLE = []
+
+def petBundle():
+    """第一次使用时打开资源包（进程内共享），没有资源包时返回 None"""
+    if not _PET_BUNDLE:
+        _PET_BUNDLE.append(AssetBundle.open(str(BUNDLE_FILE)))
+    return _PET_BUNDLE[0]
 
-class PetWidget(QLabel):
+class PetWidget(QWidget):
     """宠物表情显示组件"""
     clicked = Signal()
+    firstPainted = Signal()
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, resize_settle_ms=PET_RESIZE_SETTLE_MS):
         super().__init__(parent)
-        self.setAlignment(Qt.AlignCenter)
         self.setMinimumSize(200, 200)
-        self.setScaledContents(False)
         self.setFocusPolicy(Qt.StrongFocus)
         self.setToolTip("点击或按空格键切换表情")
         
-        # 表情图片缓存
-        self.pixmap_cache = {}
+        # 当前绘制的图片；连续调整大小期间用快速变换绘制，停下后再平滑缩放
+        self.display_pixmap = None
+        self.last_pixmap = (None, None)
+        self.painted = False
+        self.resizing = False
+        self.resize_settle_ms = resize_settle_ms
+        self.settle_timer = QtCore.QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.onResizeSettled)
+        
+        # 表情图片缓存：原图第一次用到时才解码，缩放结果单独缓存
+        self.source_cache = PixmapCache(PET_SOURCE_CACHE_BYTES)
+        self.scaled_cache = PixmapCache(PET_SCALED_CACHE_BYTES)
+        self.missing_emotions = set()
         self.current_emotion = "normal"
         self.previous_emotion = "normal"
+        self.bundle = petBundle()
         
-        # 加载所有表情图片
-        self.load_all_emotions()
-        
-        # 设置默认表情
+        # 设置默认表情（只解码这一张）
         self.setEmotion("normal")
     
-    def load_all_emotions(self):
-        """预加载所有表情图片"""
-        for emotion, path in EMOTION_FILES.items():
-            pixmap = QPixmap()
-            if pixmap.load(path):
-                self.pixmap_cache[emotion] = pixmap
-            else:
-                print(f"警告: 无法加载表情图片: {path}")
+    def load_emotion(self, emotion):
+        """按需解码表情原图，失败返回 None"""
+        pixmap = self.source_cache.get(emotion)
+        if pixmap is not None:
+            return pixmap
+        if emotion in self.missing_emotions:
+            # 确保至少有一个默认表情
+            return self.create_placeholder_pixmap() if emotion == "normal" else None
         
-        # 确保至少有一个默认表情
-        if "normal" not in self.pixmap_cache:
+        if self.bundle is not None and emotion in self.bundle:
+            # 资源包里的最大一级当作原图，不需要解码
+            pixmap = QPixmap.fromImage(self.bundle.largest(emotion))
+            self.source_cache.put(emotion, pixmap)
+            return pixmap
+        
+        path = EMOTION_FILES.get(emotion)
+        if path is None and emotion != "normal":
+            return None
+        pixmap = QPixmap()
+        if path is None or not pixmap.load(path):
+            print(f"警告: 无法加载表情图片: {path}")
+            self.missing_emotions.add(emotion)
+            if emotion != "normal":
+                return None
             # 创建默认的占位图
-            self.pixmap_cache["normal"] = self.create_placeholder_pixmap()
+            pixmap = self.create_placeholder_pixmap()
+        self.source_cache.put(emotion, pixmap)
+        return pixmap
     
     def create_placeholder_pixmap(self):
         """创建占位图片"""
@@ -80,16 +267,11 @@ class PetWidget(QLabel):
     
     def setEmotion(self, emotion_name):
         """设置当前表情"""
-        if emotion_name in self.pixmap_cache:
-            self.current_emotion = emotion_name
-            self.updatePixmap()
-            return True
-        elif emotion_name == "normal" and "normal" not in self.pixmap_cache:
-            self.current_emotion = "normal"
-            self.pixmap_cache["normal"] = self.create_placeholder_pixmap()
-            self.updatePixmap()
-            return True
-        return False
+        if self.load_emotion(emotion_name) is None:
+            return False
+        self.current_emotion = emotion_name
+        self.updatePixmap()
+        return True
     
     def getEmotion(self):
         """获取当前表情"""
@@ -97,34 +279,103 @@ class PetWidget(QLabel):
     
     def setHappyTemporarily(self, duration_ms=1500):
         """临时设置为开心表情，然后恢复"""
-        self.previous_emotion = self.current_emotion
-        self.setEmotion("happy")
+        self.setEmotionTemporarily("happy", duration_ms)
+    
+    def setEmotionTemporarily(self, emotion_name, duration_ms):
+        """临时切换表情，然后恢复"""
+        if self.current_emotion != emotion_name:
+            self.previous_emotion = self.current_emotion
+        self.setEmotion(emotion_name)
         
         # 设置定时器恢复之前的状态
-        QtCore.QTimer.singleShot(duration_ms, self.restorePreviousEmotion)
+        QtCore.QTimer.singleShot(duration_ms, lambda: self.restorePreviousEmotion(emotion_name))
     
-    def restorePreviousEmotion(self):
+    def restorePreviousEmotion(self, emotion_name="happy"):
         """恢复之前的状态，除非中途被手动切换"""
-        if self.current_emotion == "happy":
+        if self.current_emotion == emotion_name:
             self.setEmotion(self.previous_emotion)
     
+    def scaledPixmap(self, emotion, size):
+        """获取缩放到指定尺寸的表情图片，同一表情、尺寸和像素比只缩放一次"""
+        dpr = self.devicePixelRatioF()
+        key = (emotion, size.width(), size.height(), dpr)
+        scaled_pixmap = self.scaled_cache.get(key)
+        if scaled_pixmap is not None:
+            return scaled_pixmap
+        
+        if self.bundle is not None and emotion in self.bundle:
+            # 从不小于目标尺寸的最小一级预缩放图缩小（尺寸正好时 scaled 直接返回原图），
+            # 比从原图缩放快得多，显示大小不变
+            pixmap = QPixmap.fromImage(self.bundle.nearest(emotion, size * dpr))
+        else:
+            pixmap = self.load_emotion(emotion)
+        if pixmap is None or pixmap.isNull():
+            return None
+        # 缩放图片以适应标签大小（按物理像素），保持宽高比
+        scaled_pixmap = pixmap.scaled(
+            size * dpr,
+            Qt.KeepAspectRatio,
+            Qt.SmoothTransformation
+        )
+        scaled_pixmap.setDevicePixelRatio(dpr)
+        self.scaled_cache.put(key, scaled_pixmap)
+        return scaled_pixmap
+    
+    @profiled("updatePixmap")
     def updatePixmap(self):
         """更新显示的图片"""
-        if self.current_emotion in self.pixmap_cache:
-            pixmap = self.pixmap_cache[self.current_emotion]
-            if not pixmap.isNull():
-                # 缩放图片以适应标签大小，保持宽高比
-                scaled_pixmap = pixmap.scaled(
-                    self.size(), 
-                    Qt.KeepAspectRatio, 
-                    Qt.SmoothTransformation
-                )
-                self.setPixmap(scaled_pixmap)
+        if self.resizing:
+            # 调整大小期间不做平滑缩放，paintEvent 用快速变换绘制
+            self.display_pixmap = None
+        else:
+            self.display_pixmap = self.scaledPixmap(self.current_emotion, self.size())
+        self.update()
+    
+    def onResizeSettled(self):
+        """尺寸稳定 - 做一次平滑缩放"""
+        self.resizing = False
+        self.updatePixmap()
+    
+    def paintEvent(self, event):
+        """直接绘制表情图片，居中并保持宽高比"""
+        pixmap = self.display_pixmap
+        fast = self.resizing or pixmap is None
+        if fast:
+            # 快速路径：优先拉伸同一表情上一次的缩放结果，没有时才用原图
+            last_emotion, pixmap = self.last_pixmap
+            if last_emotion != self.current_emotion or pixmap is None:
+                pixmap = self.load_emotion(self.current_emotion)
+        if pixmap is None or pixmap.isNull():
+            return
+        
+        size = pixmap.deviceIndependentSize().toSize()
+        if fast:
+            size = size.scaled(self.size(), Qt.KeepAspectRatio)
+        target = QStyle.alignedRect(self.layoutDirection(), Qt.AlignCenter, size, self.rect())
+        
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, not fast)
+        painter.drawPixmap(target, pixmap)
+        painter.end()
+        
+        if not self.painted:
+            self.painted = True
+            self.firstPainted.emit()
+        
+        if not fast:
+            self.last_pixmap = (self.current_emotion, pixmap)
     
     def resizeEvent(self, event):
         """重写resize事件，调整图片大小"""
         super().resizeEvent(event)
-        self.updatePixmap()
+        if self.resize_settle_ms <= 0 or not self.isVisible() or not event.oldSize().isValid():
+            # 未开启节流或首次布局时直接平滑缩放
+            self.updatePixmap()
+            return
+        # 连续调整大小：先快速绘制，停下后再平滑缩放
+        self.resizing = True
+        self.settle_timer.start(self.resize_settle_ms)
+        self.update()
     
     def mousePressEvent(self, event):
         """点击事件 - 切换表情"""
@@ -145,148 +396,1342 @@ class PetWidget(QLabel):
         emotions = list(EMOTION_FILES.keys())
         if not emotions:
             return
-            
+        
         current_index = emotions.index(self.current_emotion) if self.current_emotion in emotions else 0
         next_index = (current_index + 1) % len(emotions)
         self.setEmotion(emotions[next_index])
 
-class TodoItemWidget(QWidget):
-    """待办项自定义组件"""
-    toggled = Signal(bool)
-    deleted = Signal()
+class TodoSearchIndex:
+    """增量维护的分词索引：词 -> 规范化标题集合
+    
+    查询时每个词按前缀匹配，结果取交集，耗时与命中数量相关而与列表总长度无关。
+    """
+    
+    def __init__(self, keys=()):
+        self.postings = {}
+        self._sorted_tokens = None
+        for key in keys:
+            self.add(key)
+    
+    @staticmethod
+    def tokenize(text):
+        return set(TOKEN_RE.findall(normalize_title(text)))
+    
+    def add(self, key):
+        for token in self.tokenize(key):
+            keys = self.postings.get(token)
+            if keys is None:
+                keys = self.postings[token] = set()
+                if self._sorted_tokens is not None:
+                    bisect.insort(self._sorted_tokens, token)
+            keys.add(key)
+    
+    def remove(self, key):
+        for token in self.tokenize(key):
+            keys = self.postings.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                if self._sorted_tokens is not None:
+                    del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+    
+    def _prefixKeys(self, prefix):
+        """所有以 prefix 开头的词对应的标题"""
+        if self._sorted_tokens is None:
+            # 第一次查询时排序一次，之后随增删插入或删除，不再整体重排
+            self._sorted_tokens = sorted(self.postings)
+        tokens = self._sorted_tokens
+        i = bisect.bisect_left(tokens, prefix)
+        keys = set()
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            keys |= self.postings[tokens[i]]
+            i += 1
+        return keys
+    
+    def search(self, query):
+        """返回匹配的规范化标题集合；查询为空时返回 None 表示全部"""
+        tokens = self.tokenize(query)
+        if not tokens:
+            return None
+        result = None
+        # 长词通常更有区分度，先算它们以尽早缩小结果
+        for token in sorted(tokens, key=len, reverse=True):
+            keys = self._prefixKeys(token)
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return result
+
+class TodoListModel(QtCore.QAbstractListModel):
+    """待办列表数据模型：数据保存在 TodoStore 里，视图和保存都不经过控件"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = TodoStore()
+        # 搜索索引：加载完后由 SearchIndexBuilder 在空闲时分批建立（_index_pending 是还没加入的标题），
+        # 之后随增删改同步更新；还没建完就搜索时同步补完
+        self._search_index = None
+        self._index_pending = []
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._store)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._store):
+            return None
+        todo = self._store.at(index.row())
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return todo.title
+        if role == Qt.ToolTipRole:
+            if todo.due is None:
+                return todo.title
+            return f"{todo.title}\n{describeReminder(todo.due, todo.every)}"
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if todo.done else Qt.Unchecked
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        done = Qt.CheckState(value) == Qt.Checked
+        if not self._store.set_done(self._store.at(index.row()).id, done):
+            return False
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsEditable
+    
+    def store(self):
+        """底层的待办记录"""
+        return self._store
+    
+    def rowOf(self, title):
+        """按规范化标题查找行号，不存在返回 -1"""
+        todo = self._store.find(title)
+        return self._store.row(todo.id) if todo is not None else -1
+    
+    def rowOfId(self, todo_id):
+        """按记录 ID 查找行号，不存在返回 -1"""
+        return self._store.row(todo_id)
+    
+    def contains(self, title):
+        """是否已存在同名待办"""
+        return self._store.find(title) is not None
+    
+    def startSearchIndex(self):
+        """开始建立搜索索引，返回还没加入索引的标题数（由 indexStep 分批加入）"""
+        if self._search_index is None:
+            self._search_index = TodoSearchIndex()
+            self._index_pending = list(self._store.keys())
+        return len(self._index_pending)
+    
+    def indexStep(self, count):
+        """把最多 count 个还没加入的标题加入搜索索引，全部加入后返回 True"""
+        pending = self._index_pending
+        if self._search_index is None or not pending:
+            return True
+        batch = pending[-count:]
+        del pending[-len(batch):]
+        for key in batch:
+            # 等待期间已删除或改名的跳过；新加的已经由 append/extend/rename 加入
+            if self._store.find_key(key) is not None:
+                self._search_index.add(key)
+        return not pending
+    
+    def search(self, query):
+        """按关键词搜索，返回匹配的规范化标题集合（None 表示全部）"""
+        if self.startSearchIndex():
+            self.indexStep(len(self._index_pending))
+        return self._search_index.search(query)
+    
+    def rowsOfKeys(self, keys):
+        """一组规范化标题对应的行号（升序）"""
+        return self._store.rows_of_keys(keys)
+    
+    def append(self, title, done=False):
+        """在末尾追加一项"""
+        row = len(self._store)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._store.add(title, done)
+        if self._search_index is not None:
+            self._search_index.add(normalize_title(title))
+        self.endInsertRows()
+        return row
+    
+    def extend(self, todos):
+        """批量追加（调用方保证已查重），空模型时用一次重置代替逐行插入"""
+        if not todos:
+            return 0
+        first = len(self._store)
+        if first == 0:
+            self.beginResetModel()
+        else:
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(todos) - 1)
+        for todo in todos:
+            self._store.add(todo["title"], todo["done"], todo.get("due"), todo.get("every", 0))
+            if self._search_index is not None:
+                self._search_index.add(normalize_title(todo["title"]))
+        if first == 0:
+            self.endResetModel()
+        else:
+            self.endInsertRows()
+        return len(todos)
+    
+    def remove(self, row):
+        """删除指定行"""
+        if not 0 <= row < len(self._store):
+            return False
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        removed = self._store.pop(row)
+        if self._search_index is not None:
+            self._search_index.remove(normalize_title(removed.title))
+        self.endRemoveRows()
+        return True
+    
+    def rename(self, row, title):
+        """重命名指定行，新标题与其他项重复时返回 False"""
+        if not 0 <= row < len(self._store):
+            return False
+        todo = self._store.at(row)
+        old_key = normalize_title(todo.title)
+        if not self._store.rename(todo.id, title):
+            return False
+        if self._search_index is not None:
+            self._search_index.remove(old_key)
+            self._search_index.add(normalize_title(title))
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+    
+    def setReminder(self, row, due, every=0):
+        """设置或取消（due 为 None）指定行的提醒，没有变化时返回 False"""
+        if not 0 <= row < len(self._store):
+            return False
+        if not self._store.set_reminder(self._store.at(row).id, due, every):
+            return False
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ToolTipRole])
+        return True
+    
+    def title(self, row):
+        """获取指定行的文本"""
+        return self._store.at(row).title
+    
+    def isDone(self, row):
+        """指定行是否已完成"""
+        return self._store.at(row).done
+    
+    def todos(self):
+        """获取所有待办项的副本"""
+        return self._store.to_dicts()
+    
+    def clear(self):
+        """清空所有项"""
+        self.beginResetModel()
+        self._store.clear()
+        self._search_index = None
+        self._index_pending = []
+        self.endResetModel()
+
+class TodoFilterProxyModel(QtCore.QAbstractProxyModel):
+    """过滤代理：只暴露给定的源行（按源顺序），不逐行评估过滤条件"""
     
-    def __init__(self, text, done=False, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
+        self._rows = []
+        self._proxy_rows = None
+    
+    def setSourceRows(self, rows):
+        """设置可见的源行号（已排序）"""
+        self.beginResetModel()
+        self._rows = rows
+        self._proxy_rows = None
+        self.endResetModel()
+    
+    def sourceRow(self, row):
+        return self._rows[row]
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+    
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+    
+    def index(self, row, column=0, parent=QtCore.QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self._rows) or column != 0:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index):
+        return QtCore.QModelIndex()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or not 0 <= proxy_index.row() < len(self._rows):
+            return QtCore.QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()])
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        if self._proxy_rows is None:
+            self._proxy_rows = {source_row: row for row, source_row in enumerate(self._rows)}
+        row = self._proxy_rows.get(source_index.row())
+        return self.index(row) if row is not None else QtCore.QModelIndex()
+
+class TodoItemDelegate(QStyledItemDelegate):
+    """待办项绘制代理 - 自绘复选框、删除线和删除按钮，不为每行创建控件"""
+    toggleRequested = Signal(int)
+    deleteRequested = Signal(int)
+    renameRequested = Signal(int, str)
+    
+    MARGIN_H = 5
+    MARGIN_V = 2
+    SPACING = 6
+    
+    def _style(self, option):
+        return option.widget.style() if option.widget else QApplication.style()
+    
+    def _checkRect(self, option):
+        """复选框区域"""
+        style = self._style(option)
+        w = style.pixelMetric(QStyle.PM_IndicatorWidth, option, option.widget)
+        h = style.pixelMetric(QStyle.PM_IndicatorHeight, option, option.widget)
+        rect = option.rect
+        return QtCore.QRect(rect.left() + self.MARGIN_H,
+                            rect.top() + (rect.height() - h) // 2, w, h)
+    
+    def _deleteRect(self, option):
+        """删除按钮区域"""
+        rect = option.rect
+        size = rect.height() - 2 * self.MARGIN_V
+        return QtCore.QRect(rect.right() - self.MARGIN_H - size + 1,
+                            rect.top() + self.MARGIN_V, size, size)
+    
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        style = self._style(opt)
+        done = index.data(Qt.CheckStateRole) == Qt.Checked
+        text = opt.text
+        
+        # 背景、选中和悬停状态交给样式绘制
+        opt.text = ""
+        opt.features &= ~QStyleOptionViewItem.HasCheckIndicator
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
         
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(5, 2, 5, 2)
+        painter.save()
         
         # 复选框
-        self.checkbox = QCheckBox(text)
-        self.checkbox.setChecked(done)
-        self.checkbox.stateChanged.connect(self.onStateChanged)
-        self.updateTextStyle(done)
-        layout.addWidget(self.checkbox)
+        check_opt = QStyleOptionButton()
+        check_opt.rect = self._checkRect(option)
+        check_opt.state = QStyle.State_Enabled | (QStyle.State_On if done else QStyle.State_Off)
+        style.drawPrimitive(QStyle.PE_IndicatorCheckBox, check_opt, painter, opt.widget)
         
         # 删除按钮
-        self.delete_btn = QToolButton()
-        self.delete_btn.setText("×")
-        self.delete_btn.setToolTip("删除此项")
-        self.delete_btn.clicked.connect(self.deleteItem)
-        layout.addWidget(self.delete_btn)
-        
-        self.setLayout(layout)
-    
-    def onStateChanged(self, state):
-        """复选框状态改变"""
-        checked = state == Qt.Checked
-        self.updateTextStyle(checked)
-        self.toggled.emit(checked)
-    
-    def updateTextStyle(self, done):
-        """更新文本样式"""
-        font = self.checkbox.font()
-        font.setStrikeOut(done)
-        self.checkbox.setFont(font)
+        delete_rect = self._deleteRect(option)
+        if opt.state & QStyle.State_MouseOver:
+            button_opt = QStyleOptionButton()
+            button_opt.rect = delete_rect
+            button_opt.state = QStyle.State_Enabled | QStyle.State_Raised
+            style.drawPrimitive(QStyle.PE_PanelButtonTool, button_opt, painter, opt.widget)
+        painter.setPen(opt.palette.color(QPalette.ButtonText))
+        painter.drawText(delete_rect, Qt.AlignCenter, "×")
         
-        palette = self.checkbox.palette()
-        color = palette.color(QPalette.WindowText)
-        color = QColor(color)
+        # 文本：已完成的显示删除线并变淡
+        font = QtGui.QFont(opt.font)
+        font.setStrikeOut(done)
+        painter.setFont(font)
+        color = QColor(opt.palette.color(
+            QPalette.HighlightedText if opt.state & QStyle.State_Selected else QPalette.WindowText))
         color.setAlpha(128 if done else 255)
-        palette.setColor(QPalette.WindowText, color)
-        self.checkbox.setPalette(palette)
+        painter.setPen(color)
+        text_rect = self._textRect(option)
+        elided = QtGui.QFontMetrics(font).elidedText(text, Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, elided)
+        
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        style = self._style(option)
+        indicator = style.pixelMetric(QStyle.PM_IndicatorHeight, option, option.widget)
+        height = max(option.fontMetrics.height(), indicator) + 2 * self.MARGIN_V + 8
+        return QtCore.QSize(option.rect.width(), height)
     
-    def deleteItem(self):
-        """删除此项"""
-        self.deleted.emit()
+    def _textRect(self, option):
+        """文本区域"""
+        rect = QtCore.QRect(option.rect)
+        rect.setLeft(self._checkRect(option).right() + self.SPACING)
+        rect.setRight(self._deleteRect(option).left() - self.SPACING)
+        return rect
     
-    def text(self):
-        """获取文本"""
-        return self.checkbox.text()
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(self._textRect(option))
     
-    def isChecked(self):
-        """是否已勾选"""
-        return self.checkbox.isChecked()
+    def setModelData(self, editor, model, index):
+        """编辑结束 - 交给列表做查重后重命名"""
+        self.renameRequested.emit(index.row(), editor.text())
+    
+    def editorEvent(self, event, model, option, index):
+        """处理点击和按键：勾选或删除"""
+        event_type = event.type()
+        if event_type in (QtCore.QEvent.MouseButtonPress, QtCore.QEvent.MouseButtonDblClick):
+            # 吞掉按下事件，避免视图在点击按钮时改变选择
+            return (event.button() == Qt.LeftButton
+                    and option.rect.contains(event.position().toPoint()))
+        if event_type == QtCore.QEvent.MouseButtonRelease:
+            if event.button() != Qt.LeftButton:
+                return False
+            pos = event.position().toPoint()
+            if self._deleteRect(option).contains(pos):
+                self.deleteRequested.emit(index.row())
+                return True
+            if option.rect.contains(pos):
+                self.toggleRequested.emit(index.row())
+                return True
+            return False
+        if event_type == QtCore.QEvent.KeyPress:
+            if event.key() in (Qt.Key_Space, Qt.Key_Select):
+                self.toggleRequested.emit(index.row())
+                return True
+            if event.key() == Qt.Key_Delete:
+                self.deleteRequested.emit(index.row())
+                return True
+        return False
 
-class TodoListWidget(QListWidget):
+def dedupeTodos(model, archive, todos):
+    """去掉空标题、批内重复以及模型中已有或已归档（archive 可为 None）的待办
+    
+    返回可以直接交给 model.extend 的 {"title", "done"} 列表（有提醒时带 "due"/"every"）。
+    """
+    batch = []
+    seen = set()
+    for todo in todos:
+        cleaned_title = todo["title"].strip()
+        key = normalize_title(cleaned_title)
+        if (not key or key in seen or model.contains(cleaned_title)
+                or (archive is not None and key in archive)):
+            continue
+        seen.add(key)
+        entry = {"title": cleaned_title, "done": bool(todo.get("done", False))}
+        if todo.get("due") is not None:
+            entry["due"] = todo["due"]
+            entry["every"] = todo.get("every", 0)
+        batch.append(entry)
+    return batch
+
+def describeReminder(due, every):
+    """提醒的说明文字"""
+    text = "提醒: " + time.strftime("%Y-%m-%d %H:%M", time.localtime(due))
+    for label, seconds in REMINDER_REPEAT_CHOICES:
+        if seconds and seconds == every:
+            return f"{text}，{label}"
+    if every:
+        return f"{text}，每 {every // 60} 分钟"
+    return text
+
+class TodoListWidget(QListView):
     """待办列表组件"""
-    def __init__(self, parent=None):
+    itemToggled = Signal(int, bool)
+    itemDeleted = Signal(str)
+    itemRenamed = Signal(str, str)
+    reminderRequested = Signal(int, bool)  # 源模型行号, 是否取消提醒
+    
+    def __init__(self, parent=None, model=None):
         super().__init__(parent)
         self.setAlternatingRowColors(True)
+        # 所有行高度一致，视图只需测量一次，滚动时只绘制可见行
+        self.setUniformItemSizes(True)
+        # 分批布局：大量插入后每次只布局一批就回到事件循环
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(5000)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        # F2 重命名；单击留给勾选
+        self.setEditTriggers(QAbstractItemView.EditKeyPressed)
+        
+        self.todo_model = model if model is not None else TodoListModel(self)
+        self.setModel(self.todo_model)
+        
+        # 已归档的标题也参与查重（支持 `规范化标题 in archive`），None 表示不检查
+        self.archive = None
+        
+        # 过滤时视图切换到代理模型，不过滤时直接显示源模型
+        self.filter_text = ""
+        self.filter_state = FILTER_ALL
+        self.proxy_model = TodoFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.todo_model)
+        self.connectSourceModel(True)
+        
+        self.delegate = TodoItemDelegate(self)
+        self.delegate.toggleRequested.connect(lambda row: self.toggle_item(self.sourceRow(row)))
+        self.delegate.deleteRequested.connect(lambda row: self.remove_item(self.sourceRow(row)))
+        self.delegate.renameRequested.connect(lambda row, title: self.rename_todo(self.sourceRow(row), title))
+        self.setItemDelegate(self.delegate)
+    
+    def connectSourceModel(self, connect):
+        """连接（或断开）源模型的变化通知"""
+        model = self.todo_model
+        for signal, slot in ((model.rowsInserted, self.onSourceRowsChanged),
+                             (model.rowsRemoved, self.onSourceRowsChanged),
+                             (model.modelReset, self.onSourceRowsChanged),
+                             (model.dataChanged, self.onSourceDataChanged)):
+            if connect:
+                signal.connect(slot)
+            else:
+                signal.disconnect(slot)
+    
+    def setTodoModel(self, model):
+        """换用另一个列表的数据模型（切换列表），保留当前的搜索和过滤条件"""
+        if model is self.todo_model:
+            return
+        self.connectSourceModel(False)
+        self.todo_model = model
+        self.proxy_model.setSourceModel(model)
+        self.connectSourceModel(True)
+        self.setModel(model)
+        self.applyFilter()
+    
+    def count(self):
+        """待办项数量"""
+        return self.todo_model.rowCount()
+    
+    def isFiltered(self):
+        """是否处于过滤状态"""
+        return self.model() is self.proxy_model
+    
+    def sourceRow(self, row):
+        """视图行号 -> 源模型行号"""
+        return self.proxy_model.sourceRow(row) if self.isFiltered() else row
+    
+    def visibleCount(self):
+        """当前显示的项数"""
+        return self.model().rowCount()
+    
+    def setFilter(self, text, state=FILTER_ALL):
+        """按关键词和完成状态过滤"""
+        self.filter_text = text
+        self.filter_state = state
+        self.applyFilter()
+    
+    def applyFilter(self):
+        """重新计算可见行：有关键词时只处理索引命中的项"""
+        text, state = self.filter_text.strip(), self.filter_state
+        if not text and state == FILTER_ALL:
+            if self.isFiltered():
+                self.setModel(self.todo_model)
+            return
+        
+        model = self.todo_model
+        keys = model.search(text) if text else None
+        want_done = state == FILTER_DONE
+        if keys is None:
+            rows = [row for row, todo in enumerate(model.store()) if todo.done == want_done]
+        else:
+            rows = model.rowsOfKeys(keys)
+            if state != FILTER_ALL:
+                rows = [row for row in rows if model.isDone(row) == want_done]
+        self.proxy_model.setSourceRows(rows)
+        if not self.isFiltered():
+            self.setModel(self.proxy_model)
+    
+    def onSourceRowsChanged(self, *args):
+        """源模型增删或重置后刷新过滤结果"""
+        if self.isFiltered():
+            self.applyFilter()
+    
+    def onSourceDataChanged(self, top_left, bottom_right, roles=()):
+        """勾选或重命名可能改变过滤结果"""
+        if not self.isFiltered() or list(roles) == [Qt.ToolTipRole]:
+            return  # 只改了提醒，不影响过滤结果
+        if self.filter_state == FILTER_ALL and Qt.CheckStateRole in roles:
+            # 只改了完成状态且不按状态过滤：原地刷新即可
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                index = self.proxy_model.mapFromSource(self.todo_model.index(row))
+                if index.isValid():
+                    self.proxy_model.dataChanged.emit(index, index, roles)
+            return
+        self.applyFilter()
     
     def add_todo(self, title, done=False):
         """添加待办项"""
-        # 检查是否已存在（忽略前后空格和大小写）
+        # 检查是否已存在（忽略空白差异和大小写）
         cleaned_title = title.strip()
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if widget and widget.text().strip().lower() == cleaned_title.lower():
-                return False  # 已存在
+        if (not cleaned_title or self.todo_model.contains(cleaned_title)
+                or self.isArchived(normalize_title(cleaned_title))):
+            return False  # 已存在
         
-        # 创建新项
-        item = QListWidgetItem(self)
-        widget = TodoItemWidget(cleaned_title, done)
-        
-        # 连接信号
-        widget.toggled.connect(lambda checked, i=item: self.onItemToggled(i, checked))
-        widget.deleted.connect(lambda: self.remove_item(item))
+        self.todo_model.append(cleaned_title, done)
+        return True
+    
+    def add_todos(self, todos):
+        """批量添加待办项，返回实际添加的数量
         
-        item.setSizeHint(widget.sizeHint())
-        self.setItemWidget(item, widget)
+        todos 为 {"title": ..., "done": ...} 字典的可迭代对象。整批只查重一次、
+        只通知视图一次，适合启动加载和导入。
+        """
+        batch = dedupeTodos(self.todo_model, self.archive, todos)
+        if not batch:
+            return 0
         
+        # 插入期间暂停重绘和列表信号
+        updates_enabled = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        signals_blocked = self.blockSignals(True)
+        try:
+            added = self.todo_model.extend(batch)
+        finally:
+            self.blockSignals(signals_blocked)
+            self.setUpdatesEnabled(updates_enabled)
+        return added
+    
+    def rename_todo(self, row, title):
+        """重命名待办项"""
+        cleaned_title = title.strip()
+        if not cleaned_title or not 0 <= row < self.todo_model.rowCount():
+            return False
+        old_title = self.todo_model.title(row)
+        if cleaned_title == old_title:
+            return False
+        if self.isArchived(normalize_title(cleaned_title)):
+            return False
+        if not self.todo_model.rename(row, cleaned_title):
+            return False
+        self.itemRenamed.emit(old_title, cleaned_title)
         return True
     
-    def remove_item(self, item):
+    def isArchived(self, key):
+        """规范化标题是否已在归档中"""
+        return self.archive is not None and key in self.archive
+    
+    def remove_todos(self, titles):
+        """按标题批量删除（不发出 itemDeleted），返回删除的数量"""
+        rows = sorted((self.todo_model.rowOf(title) for title in titles), reverse=True)
+        removed = 0
+        for row in rows:
+            if row >= 0 and self.todo_model.remove(row):
+                removed += 1
+        return removed
+    
+    def toggle_item(self, row):
+        """切换指定行的完成状态"""
+        checked = not self.todo_model.isDone(row)
+        index = self.todo_model.index(row)
+        if self.todo_model.setData(index, Qt.Checked if checked else Qt.Unchecked, Qt.CheckStateRole):
+            self.onItemToggled(row, checked)
+    
+    def remove_item(self, row):
         """删除项"""
-        row = self.row(item)
-        if row >= 0:
-            self.takeItem(row)
+        if 0 <= row < self.todo_model.rowCount():
+            title = self.todo_model.title(row)
+            self.todo_model.remove(row)
+            self.itemDeleted.emit(title)
     
-    def onItemToggled(self, item, checked):
+    def onItemToggled(self, row, checked):
         """项状态改变"""
-        # 可以在这里添加额外处理
-        pass
+        self.itemToggled.emit(row, checked)
+    
+    def contextMenuEvent(self, event):
+        """右键菜单：设置或取消提醒"""
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            return
+        row = self.sourceRow(index.row())
+        menu = QMenu(self)
+        menu.addAction("设置提醒…", lambda: self.reminderRequested.emit(row, False))
+        if self.todo_model.store().at(row).due is not None:
+            menu.addAction("取消提醒", lambda: self.reminderRequested.emit(row, True))
+        menu.exec(event.globalPos())
     
     def get_all_todos(self):
         """获取所有待办项"""
-        todos = []
-        for i in range(self.count()):
-            item = self.item(i)
-            widget = self.itemWidget(item)
-            if widget:
-                todos.append({
-                    "title": widget.text(),
-                    "done": widget.isChecked()
-                })
-        return todos
+        return self.todo_model.todos()
     
     def clear_all(self):
         """清空所有项"""
-        self.clear()
+        self.todo_model.clear()
+
+class ChunkedTask(QtCore.QObject):
+    """在 GUI 线程分块执行的任务，每块之间回到事件循环，界面保持响应
+    
+    子类实现 step()（处理一块，全部完成时返回 True）、cleanup() 和 summary()。
+    """
+    progress = Signal(int)  # 百分比
+    finished = Signal(str)  # 完成提示
+    failed = Signal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run)
+        self._running = False
+    
+    def start(self):
+        self._running = True
+        self._timer.start()
+    
+    def isRunning(self):
+        return self._running
+    
+    def finish(self):
+        """不再等待事件循环，在当前调用中执行完剩余的块"""
+        self._timer.stop()
+        while self._running:
+            self._run()
+        self._timer.stop()
+    
+    def cancel(self):
+        """中止任务并释放文件"""
+        if self._running:
+            self._timer.stop()
+            self._running = False
+            self.cleanup(False)
+    
+    def _run(self):
+        try:
+            done = self.step()
+        except (OSError, ValueError) as e:
+            self._running = False
+            self.cleanup(False)
+            self.failed.emit(str(e))
+            return
+        if done:
+            self._running = False
+            self.cleanup(True)
+            self.finished.emit(self.summary())
+        else:
+            self._timer.start()
+    
+    def step(self):
+        raise NotImplementedError
+    
+    def cleanup(self, completed):
+        pass
+    
+    def summary(self):
+        return ""
+
+class TodoImporter(ChunkedTask):
+    """流式导入：逐块读取文件，每块走批量添加和查重，只在内存中保留当前一块"""
+    chunkAdded = Signal(list)  # 这一块实际添加的变更记录
+    
+    def __init__(self, todo_list, path, fmt=None, chunk_size=IMPORT_CHUNK_SIZE, parent=None):
+        super().__init__(parent)
+        self.todo_list = todo_list
+        self.chunk_size = chunk_size
+        self.reader = TodoReader(path, fmt)
+        self._chunks = iter_chunks(self.reader, chunk_size)
+        self._pending = []
+        self.added = 0
+        self.total = 0
+    
+    def step(self):
+        chunk = next(self._chunks, None)
+        if chunk is not None:
+            self.total += len(chunk)
+            self._pending += chunk
+        # 每次插入后视图都要重新布局全部行，所以攒够与列表长度成比例的一批再插入，
+        # 整个导入的布局开销保持线性
+        model = self.todo_list.todo_model
+        if chunk is None or len(self._pending) >= min(max(self.chunk_size, model.rowCount() // 4), 10 * self.chunk_size):
+            self.insertPending()
+        if self.reader.size:
+            self.progress.emit(self.reader.position * 100 // self.reader.size)
+        return chunk is None
+    
+    def insertPending(self):
+        model = self.todo_list.todo_model
+        first = model.rowCount()
+        added = self.todo_list.add_todos(self._pending)
+        self._pending = []
+        if added:
+            # 新项追加在末尾，取规范化后的标题作为变更记录
+            self.chunkAdded.emit([{"op": "add", "title": model.title(row), "done": model.isDone(row)}
+                                  for row in range(first, first + added)])
+        self.added += added
+    
+    def cleanup(self, completed):
+        if self._pending:
+            # 取消时已读出的部分也加入列表
+            self.insertPending()
+        self.reader.close()
+    
+    def summary(self):
+        skipped = self.total - self.added + self.reader.invalid
+        return f"已导入 {self.added} 项，跳过 {skipped} 项"
+
+class TodoExporter(ChunkedTask):
+    """流式导出：逐块从模型取出写入临时文件，完成后替换目标文件"""
+    
+    def __init__(self, todo_list, path, fmt=None, chunk_size=IMPORT_CHUNK_SIZE, parent=None):
+        super().__init__(parent)
+        self.todo_list = todo_list
+        self.path = path
+        self.chunk_size = chunk_size
+        self.writer = TodoWriter(path, fmt)
+        self._row = 0
+    
+    def step(self):
+        model = self.todo_list.todo_model
+        end = min(self._row + self.chunk_size, model.rowCount())
+        self.writer.write({"title": model.title(row), "done": model.isDone(row)}
+                          for row in range(self._row, end))
+        self._row = end
+        if end >= model.rowCount():
+            return True
+        self.progress.emit(end * 100 // model.rowCount())
+        return False
+    
+    def cleanup(self, completed):
+        if completed:
+            self.writer.commit()
+        else:
+            self.writer.abort()
+    
+    def summary(self):
+        return f"已导出 {self.writer.count} 项到 {os.path.basename(self.path)}"
+
+class TodoLoader(ChunkedTask):
+    """启动加载：工作线程读取并解析存储，GUI 线程先插入第一屏，其余分批插入"""
+    dataRead = Signal(object)  # 存储返回的数据（没有数据时为 None），插入待办之前发出
+    rowsLoaded = Signal(int, int)  # 已插入, 总数
+    _readDone = Signal()
+    
+    def __init__(self, todo_list, storage, parent=None):
+        super().__init__(parent)
+        self.todo_list = todo_list
+        self.storage = storage
+        self.todos = None
+        self._data = None
+        self._error = None
+        self._read_finished = False
+        self._found = False
+        self._pos = 0
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # 工作线程发出的信号排队到 GUI 线程处理
+        self._readDone.connect(self._onRead)
+    
+    def start(self):
+        self._pool.start(self._read)
+    
+    @profiled("loadData.read")
+    def _read(self):
+        try:
+            self._data = self.storage.load()
+        except Exception as e:
+            self._error = e
+        self._read_finished = True
+        self._readDone.emit()
+    
+    def _onRead(self):
+        if self.todos is not None or not self._read_finished:
+            return  # 已经由 finish() 处理过
+        if self._error is not None:
+            self.todos = []
+            self.failed.emit(str(self._error))
+            return
+        self._found = self._data is not None
+        self.todos = self._data.get("todos", []) if self._found else []
+        self.dataRead.emit(self._data)
+        self._data = None
+        super().start()
+    
+    def cancel(self):
+        """停止插入；还在读取时先等工作线程结束（存储随后会关闭）"""
+        self._pool.waitForDone()
+        if self.todos is None:
+            self.todos = []
+        super().cancel()
+    
+    def finish(self):
+        """等待读取完成并同步插入剩余的待办（保存或处理外部修改前调用）"""
+        self._pool.waitForDone()
+        self._onRead()
+        super().finish()
+    
+    def targetModel(self):
+        """待办插入到的模型"""
+        return self.todo_list.todo_model
+    
+    def insertTodos(self, todos):
+        self.todo_list.add_todos(todos)
+    
+    @profiled("loadData.step")
+    def step(self):
+        model = self.targetModel()
+        if self._pos == 0:
+            size = LOAD_FIRST_SCREEN_ROWS
+        else:
+            # 与导入相同：批大小随列表增长，整个加载的布局开销保持线性
+            size = min(max(LOAD_BATCH_ROWS, model.rowCount() // 4), 10 * LOAD_BATCH_ROWS)
+        end = min(self._pos + size, len(self.todos))
+        self.insertTodos(self.todos[self._pos:end])
+        if self._pos == 0 and self.todo_list is not None:
+            STARTUP.mark("first_screen")
+        self._pos = end
+        self.rowsLoaded.emit(end, len(self.todos))
+        if self.todos:
+            self.progress.emit(end * 100 // len(self.todos))
+        return end >= len(self.todos)
+    
+    def cleanup(self, completed):
+        self.todos = []
+    
+    def summary(self):
+        if not self._found:
+            return "欢迎使用桌面宠物待办事项工具"
+        return f"已加载 {self._pos} 个待办事项"
+
+class SessionLoader(TodoLoader):
+    """后台加载不显示在界面上的列表（命令行要操作时）：同样在工作线程读取，分批直接插入该列表的模型"""
+    
+    def __init__(self, session, parent=None):
+        super().__init__(None, session.storage, parent)
+        self.session = session
+    
+    def targetModel(self):
+        return self.session.model
+    
+    def insertTodos(self, todos):
+        model = self.session.model
+        model.extend(dedupeTodos(model, self.session.archive, todos))
+
+class SearchIndexBuilder(ChunkedTask):
+    """在空闲时分批为模型建立搜索索引，第一次搜索时不必整体建立"""
+    
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+    
+    def start(self):
+        self.model.startSearchIndex()
+        super().start()
+    
+    def step(self):
+        return self.model.indexStep(SEARCH_INDEX_BATCH)
+
+class SaveScheduler(QtCore.QObject):
+    """保存调度器 - 标记脏状态，合并短时间内的多次保存，在后台线程写盘
+    
+    写盘失败的一批变更放回待保存队列的最前面，下个合并窗口结束时重试。
+    """
+    saveFailed = Signal(str)
+    _writeFailed = Signal()
+    
+    def __init__(self, snapshot, write, delay_ms=SAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        # snapshot 在 GUI 线程调用，返回要保存的数据（None 表示现在不能保存）；
+        # write(data, changes) 在工作线程调用，changes 为这一批的变更记录
+        self._snapshot = snapshot
+        self._write = write
+        self._dirty = False
+        self._changes = []
+        # 工作线程写失败的批次，回到 GUI 线程（或 flush）时放回队列
+        self._failed = []
+        self._failed_lock = threading.Lock()
+        
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._startWrite)
+        
+        # 单线程线程池，保证写入按顺序进行
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # 工作线程发出的信号排队到 GUI 线程处理
+        self._writeFailed.connect(self._requeueFailed)
+    
+    def setDelay(self, delay_ms):
+        """设置合并窗口"""
+        self._timer.setInterval(delay_ms)
+    
+    def isDirty(self):
+        """是否有尚未写盘的修改"""
+        return self._dirty
+    
+    def schedule(self, change=None):
+        """标记为脏（可附带一条变更记录），窗口结束时统一保存"""
+        self._dirty = True
+        if change is not None:
+            self._changes.append(change)
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    def scheduleMany(self, changes):
+        """一次记录多条变更（导入时使用）"""
+        self._changes.extend(changes)
+        self.schedule()
+    
+    def _startWrite(self):
+        """在 GUI 线程取快照，交给工作线程写盘"""
+        if not self._dirty:
+            return
+        data = self._snapshot()
+        if data is None:
+            return  # 还不能保存（列表没加载），保持脏状态
+        self._dirty = False
+        changes, self._changes = self._changes, []
+        self._pool.start(lambda: self._run(data, changes))
+    
+    def _run(self, data, changes):
+        try:
+            self._writeBatch(data, changes)
+        except Exception as e:
+            with self._failed_lock:
+                self._failed.append(changes)
+            self._writeFailed.emit()
+            self.saveFailed.emit(str(e))
+    
+    def _restoreFailed(self):
+        """把写失败的批次按原顺序放回队列最前面并重新标记为脏，返回是否有失败的批次"""
+        with self._failed_lock:
+            failed, self._failed = self._failed, []
+        if not failed:
+            return False
+        self._changes = [change for changes in failed for change in changes] + self._changes
+        self._dirty = True
+        return True
+    
+    def _requeueFailed(self):
+        if self._restoreFailed() and not self._timer.isActive():
+            self._timer.start()
+    
+    @profiled("saveData.write")
+    def _writeBatch(self, data, changes):
+        self._write(data, changes)
+    
+    def flush(self):
+        """同步写出所有待保存的修改（退出时调用）"""
+        self._timer.stop()
+        self._pool.waitForDone()
+        # 后台写失败的批次可能还没排队处理到
+        self._restoreFailed()
+        if self._dirty:
+            data = self._snapshot()
+            if data is None:
+                return
+            self._dirty = False
+            changes, self._changes = self._changes, []
+            try:
+                self._writeBatch(data, changes)
+            except Exception:
+                self._changes = changes + self._changes
+                self._dirty = True
+                raise
+
+class ReminderScheduler(QtCore.QObject):
+    """提醒调度：所有提醒共用一个单次 QTimer，只在最近的到期时间唤醒
+    
+    提醒保存在模型的待办记录上（由保存调度器随列表一起保存），这里只按记录 ID 维护到期顺序。
+    记录改名时 ID 不变，提醒跟着走；记录删除时随之取消。到期时一次取出所有已过期的提醒
+    （包括休眠期间错过的），发出 remindersDue。
+    """
+    remindersDue = Signal(list)  # [(待办记录 ID, 下次到期时间或 None)]
+    
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.schedule = ReminderSchedule()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+        self._started = False
+        model.rowsAboutToBeRemoved.connect(self.onRowsAboutToBeRemoved)
+        model.modelAboutToBeReset.connect(self.schedule.clear)
+    
+    def set(self, todo_id, due, every=0):
+        """设置或取消（due 为 None）某条记录的提醒"""
+        if due is None:
+            changed = self.schedule.cancel(todo_id)
+        else:
+            changed = self.schedule.get(todo_id) != (due, every)
+            if changed:
+                self.schedule.schedule(todo_id, due, every)
+        if changed and self._started:
+            self.arm()
+    
+    def onRowsAboutToBeRemoved(self, parent, first, last):
+        """记录被删除（包括归档和外部同步），取消它们的提醒"""
+        store = self.model.store()
+        for row in range(first, last + 1):
+            self.schedule.cancel(store.at(row).id)
+    
+    def start(self):
+        """待办加载完后按记录上的提醒建立计划并开始计时"""
+        self.schedule.clear()
+        for todo in self.model.store().with_reminders():
+            self.schedule.schedule(todo.id, todo.due, todo.every)
+        self._started = True
+        self.arm()
+    
+    def arm(self):
+        """按最近的到期时间设置定时器（已过期的会立即触发）"""
+        due = self.schedule.next_due()
+        if due is None:
+            self._timer.stop()
+            return
+        delay_ms = min(max((due - time.time()) * 1000, 0), REMINDER_MAX_SLEEP_MS)
+        self._timer.start(int(delay_ms))
+    
+    def stop(self):
+        """停止计时（列表被卸载时）"""
+        self._started = False
+        self._timer.stop()
+    
+    def _fire(self):
+        fired = self.schedule.pop_due()
+        if fired:
+            self.remindersDue.emit(fired)
+        self.arm()
+
+class TodoListSession(QtCore.QObject):
+    """一个已打开的命名列表：存储、数据模型、归档、提醒和保存调度都属于这个列表
+    
+    切换列表时视图换用另一个会话的模型；最近用过的会话留在内存里，切回时不需要重新加载。
+    snapshot(session) 返回该列表要保存的快照。
+    """
+    
+    def __init__(self, name, data_dir, config, snapshot, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.dir = list_dir(data_dir, name)
+        os.makedirs(self.dir, exist_ok=True)
+        # 只有默认列表迁移 v0.0 的数据
+        legacy_files = LEGACY_TODO_FILES if name == DEFAULT_LIST else ()
+        self.storage = open_storage(self.dir, config, legacy_files=legacy_files)
+        self.model = TodoListModel(self)
+        self.archive = TodoArchive(self.dir)
+        # 提醒保存在待办记录上，待办加载完后才开始计时
+        self.reminders = ReminderScheduler(self.model, parent=self)
+        self.save_scheduler = SaveScheduler(lambda: snapshot(self), self.storage.save,
+                                            config.get("save_delay_ms", SAVE_DELAY_MS), parent=self)
+        # 待办是否已全部插入模型
+        self.loaded = False
+    
+    def close(self):
+        """同步写出未保存的修改和归档索引并关闭存储"""
+        self.reminders.stop()
+        try:
+            self.save_scheduler.flush()
+        except Exception as e:
+            print(f"保存错误: {e}")
+        try:
+            # note_done 记下的完成时间只在归档时随索引写出，关闭前补写
+            self.archive.flush()
+        except OSError as e:
+            print(f"无法保存归档索引: {e}")
+        self.storage.close()
+
+class CommandServer(QtCore.QObject):
+    """本地套接字服务：接收命令行（cli.py）发来的一行 JSON 请求，回复一行 JSON
+    
+    handler(request, respond) 可以立即回复，也可以保留 respond 稍后再回复（比如等列表在后台加载完）。
+    """
+    
+    def __init__(self, name, handler, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self._handler = handler
+        self._server = QLocalServer(self)
+        # 只允许当前用户连接（Unix 上套接字权限为 0700）
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self.onNewConnection)
+    
+    def listen(self):
+        """开始监听（调用方须持有数据目录锁，才能安全清理上次异常退出留下的套接字）"""
+        QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+    
+    def close(self):
+        self._server.close()
+    
+    def onNewConnection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.onReadyRead(socket))
+            socket.disconnected.connect(socket.deleteLater)
+    
+    def onReadyRead(self, socket):
+        """读到完整一行后交给 handler 处理"""
+        if not socket.canReadLine():
+            return
+        
+        def respond(reply):
+            try:
+                socket.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b"\n")
+                socket.disconnectFromServer()
+            except RuntimeError:
+                pass  # 延迟回复前命令行已经断开，套接字已被删除
+        
+        try:
+            request = json.loads(bytes(socket.readLine()))
+            self._handler(request, respond)
+        except Exception as e:
+            respond({"ok": False, "error": str(e)})
+
+class HistoryDialog(QDialog):
+    """已归档待办的分页浏览：最近归档的在前，每页只读取覆盖到的归档块"""
+    
+    def __init__(self, archive, page_size=HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("历史记录")
+        self.resize(420, 480)
+        self.archive = archive
+        self.page_size = page_size
+        self.page = 0
+        
+        layout = QVBoxLayout(self)
+        self.list_widget = QListWidget()
+        layout.addWidget(self.list_widget)
+        
+        nav_layout = QHBoxLayout()
+        self.prev_btn = QPushButton("上一页")
+        self.prev_btn.clicked.connect(lambda: self.showPage(self.page - 1))
+        nav_layout.addWidget(self.prev_btn)
+        self.page_label = QLabel()
+        self.page_label.setAlignment(Qt.AlignCenter)
+        nav_layout.addWidget(self.page_label, 1)
+        self.next_btn = QPushButton("下一页")
+        self.next_btn.clicked.connect(lambda: self.showPage(self.page + 1))
+        nav_layout.addWidget(self.next_btn)
+        layout.addLayout(nav_layout)
+        
+        self.showPage(0)
+    
+    def pageCount(self):
+        return max(1, -(-len(self.archive) // self.page_size))
+    
+    def showPage(self, page):
+        """读取并显示第 page 页"""
+        total = len(self.archive)
+        pages = self.pageCount()
+        self.page = max(0, min(page, pages - 1))
+        # 第 page 页对应归档末尾往前数的一段
+        end = total - self.page * self.page_size
+        start = max(end - self.page_size, 0)
+        try:
+            records = self.archive.read(start, end - start) if total else []
+        except (OSError, ValueError) as e:
+            records = []
+            self.page_label.setText(f"无法读取历史记录: {e}")
+        else:
+            self.page_label.setText(f"第 {self.page + 1} / {pages} 页，共 {total} 项")
+        self.list_widget.clear()
+        for record in reversed(records):
+            done_at = time.strftime("%Y-%m-%d", time.localtime(record["doneAt"]))
+            self.list_widget.addItem(f"{done_at}  {record['title']}")
+        self.prev_btn.setEnabled(self.page > 0)
+        self.next_btn.setEnabled(self.page < pages - 1)
+
+class ReminderDialog(QDialog):
+    """设置提醒：到期时间和重复间隔"""
+    
+    def __init__(self, title, due=None, every=0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("设置提醒")
+        layout = QFormLayout(self)
+        layout.addRow(QLabel(title))
+        self.due_edit = QDateTimeEdit()
+        self.due_edit.setCalendarPopup(True)
+        self.due_edit.setDisplayFormat("yyyy-MM-dd HH:mm")
+        if due is None:
+            due = time.time() + 3600
+        self.due_edit.setDateTime(QtCore.QDateTime.fromSecsSinceEpoch(int(due)))
+        layout.addRow("时间", self.due_edit)
+        self.repeat_combo = QComboBox()
+        for label, seconds in REMINDER_REPEAT_CHOICES:
+            self.repeat_combo.addItem(label, seconds)
+        index = self.repeat_combo.findData(every)
+        if index < 0 and every:
+            self.repeat_combo.addItem(f"每 {every // 60} 分钟", every)
+            index = self.repeat_combo.count() - 1
+        self.repeat_combo.setCurrentIndex(max(index, 0))
+        layout.addRow("重复", self.repeat_combo)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+    
+    def due(self):
+        """选择的到期时间戳"""
+        return float(self.due_edit.dateTime().toSecsSinceEpoch())
+    
+    def every(self):
+        """选择的重复间隔（秒）"""
+        return self.repeat_combo.currentData()
 
 class MainWindow(QMainWindow):
-    """主窗口"""
-    def __init__(self):
+    """主窗口
+    
+    lazy_panel 为 True 时先只显示宠物，待宠物第一次绘制后再构建待办面板并加载数据。
+    """
+    def __init__(self, lazy_panel=False):
         super().__init__()
         self.setWindowTitle("桌面宠物待办事项")
         self.setMinimumSize(640, 420)
         self.resize(900, 600)
         
         # 数据文件路径
-        self.data_dir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation)
-        if not self.data_dir:
-            self.data_dir = os.path.expanduser("~/.DeskPetTodo")
+        self.data_dir = appDataDir()
+        
+        # 存储后端由 config.json 选择（默认快照 + 追加日志），首次启动时迁移 data.json / todo.json
+        self.config = load_config(self.data_dir)
         
-        # 确保数据目录存在
-        os.makedirs(self.data_dir, exist_ok=True)
-        self.data_file = os.path.join(self.data_dir, "data.json")
+        # 命名列表：每个列表有自己的存储、归档（完成超过 archive_after_days 天的待办）和提醒；
+        # 最近用过的列表按 LRU 顺序留在内存中，当前列表排在最后
+        self.sessions = OrderedDict()
+        self.session = self.openSession(load_active_list(self.data_dir))
+        self.sessions[self.session.name] = self.session
         
         # 初始化UI
+        self.todo_list = None
+        self.transfer_task = None
+        self.todo_loader = None
+        # 命令行要操作、正在后台加载的其他列表：列表名 -> (SessionLoader, 等待加载完的请求)
+        self.session_loaders = {}
+        self.lazy_panel = lazy_panel
         self.initUI()
         
-        # 加载数据
-        self.loadData()
+        # 性能分析（可选）：卡顿检测和状态栏统计
+        if PROFILING_ENABLED:
+            self.initProfiling()
+        
+        if lazy_panel:
+            # 宠物画出来后再构建待办面板；窗口未被绘制（如最小化启动）时兜底
+            self.pet_widget.firstPainted.connect(self.scheduleTodoPanel)
+        else:
+            self.buildTodoPanel()
+    
+    @property
+    def storage(self):
+        """当前列表的存储"""
+        return self.session.storage
+    
+    @property
+    def archive(self):
+        """当前列表的归档"""
+        return self.session.archive
+    
+    @property
+    def reminders(self):
+        """当前列表的提醒调度"""
+        return self.session.reminders
+    
+    @property
+    def save_scheduler(self):
+        """当前列表的保存调度"""
+        return self.session.save_scheduler
     
     def initUI(self):
         """初始化用户界面"""
@@ -301,9 +1746,86 @@ class MainWindow(QMainWindow):
         self.pet_widget = PetWidget()
         main_layout.addWidget(self.pet_widget, 1)
         
-        # 右侧待办区域
-        right_widget = QWidget()
-        right_layout = QVBoxLayout(right_widget)
+        # 右侧待办区域（内容由 buildTodoPanel 填充）
+        self.right_widget = QWidget()
+        self.right_layout = QVBoxLayout(self.right_widget)
+        main_layout.addWidget(self.right_widget, 2)
+        
+        # 状态栏
+        self.status_bar = QStatusBar()
+        self.setStatusBar(self.status_bar)
+        self.status_bar.showMessage("就绪")
+        
+        # 导入导出进度
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(160)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        self.status_bar.addPermanentWidget(self.progress_bar)
+        
+        # 连接信号
+        self.pet_widget.clicked.connect(self.onPetClicked)
+    
+    def initProfiling(self):
+        """开启卡顿检测，并在状态栏显示最慢的处理函数"""
+        self.watchdog = StallWatchdog(QtCore.QTimer, parent=self)
+        self.watchdog.start()
+        
+        self.profile_label = QLabel()
+        self.status_bar.addPermanentWidget(self.profile_label)
+        self.profile_timer = QtCore.QTimer(self)
+        self.profile_timer.timeout.connect(self.updateProfileOverlay)
+        self.profile_timer.start(1000)
+    
+    def updateProfileOverlay(self):
+        """刷新状态栏上的性能统计"""
+        report = PROFILER.report()
+        slowest = " | ".join(f"{name} p95 {p95:.1f}ms" for name, p95 in PROFILER.slowest(3)
+                             if name != "event_loop.lag")
+        self.profile_label.setText(f"卡顿 {len(report['stalls'])} 次 | {slowest}")
+        self.profile_label.setToolTip("\n".join(
+            f"{name}: n={h['count']} p50={h['p50_ms']} p95={h['p95_ms']} p99={h['p99_ms']} max={h['max_ms']} ms"
+            for name, h in report["handlers"].items()))
+    
+    def dumpProfile(self):
+        """把性能统计写到数据目录"""
+        path = os.path.join(self.data_dir, time.strftime("profile-%Y%m%d-%H%M%S.json"))
+        try:
+            PROFILER.dump(path)
+            print(f"性能统计已写入: {path}")
+        except OSError as e:
+            print(f"无法写入性能统计: {e}")
+    
+    def showEvent(self, event):
+        """显示事件"""
+        super().showEvent(event)
+        if self.todo_list is None and self.lazy_panel:
+            QtCore.QTimer.singleShot(500, self.buildTodoPanel)
+    
+    def scheduleTodoPanel(self):
+        """宠物已显示，在下一轮事件循环构建待办面板"""
+        STARTUP.mark("first_paint")
+        QtCore.QTimer.singleShot(0, self.buildTodoPanel)
+    
+    def buildTodoPanel(self):
+        """构建右侧待办面板并加载数据"""
+        if self.todo_list is not None:
+            return
+        right_layout = self.right_layout
+        
+        # 列表切换
+        list_layout = QHBoxLayout()
+        list_layout.addWidget(QLabel("列表:"))
+        
+        self.list_combo = QComboBox()
+        self.list_combo.setToolTip("切换待办列表")
+        list_layout.addWidget(self.list_combo, 1)
+        
+        self.new_list_btn = QPushButton("新建列表")
+        self.new_list_btn.clicked.connect(self.createList)
+        list_layout.addWidget(self.new_list_btn)
+        
+        right_layout.addLayout(list_layout)
         
         # 输入区域
         input_layout = QHBoxLayout()
@@ -324,23 +1846,156 @@ class MainWindow(QMainWindow):
         
         right_layout.addLayout(input_layout)
         
-        # 待办列表
-        self.todo_list = TodoListWidget()
-        right_layout.addWidget(self.todo_list)
+        # 搜索与过滤
+        filter_layout = QHBoxLayout()
         
-        main_layout.addWidget(right_widget, 2)
+        self.search_line = QLineEdit()
+        self.search_line.setPlaceholderText("搜索...")
+        self.search_line.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.search_line)
         
-        # 状态栏
-        self.status_bar = QStatusBar()
-        self.setStatusBar(self.status_bar)
-        self.status_bar.showMessage("就绪")
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItem("全部", FILTER_ALL)
+        self.filter_combo.addItem("未完成", FILTER_OPEN)
+        self.filter_combo.addItem("已完成", FILTER_DONE)
+        filter_layout.addWidget(self.filter_combo)
+        
+        self.import_btn = QPushButton("导入")
+        self.import_btn.setToolTip("从 JSONL/CSV 文件导入待办")
+        self.import_btn.clicked.connect(self.importTodos)
+        filter_layout.addWidget(self.import_btn)
+        
+        self.export_btn = QPushButton("导出")
+        self.export_btn.setToolTip("把待办导出为 JSONL/CSV 文件")
+        self.export_btn.clicked.connect(self.exportTodos)
+        filter_layout.addWidget(self.export_btn)
+        
+        self.history_btn = QPushButton("历史")
+        self.history_btn.setToolTip("查看已归档的待办")
+        self.history_btn.clicked.connect(self.showHistory)
+        filter_layout.addWidget(self.history_btn)
+        
+        right_layout.addLayout(filter_layout)
+        
+        # 输入停顿后才过滤，避免大列表时每个按键都重新计算
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.applyFilter)
+        
+        # 待办列表
+        self.todo_list = TodoListWidget(model=self.session.model)
+        self.todo_list.archive = self.archive
+        right_layout.addWidget(self.todo_list)
+        STARTUP.mark("todo_panel")
         
         # 连接信号
-        self.pet_widget.clicked.connect(self.onPetClicked)
+        self.todo_list.itemToggled.connect(self.onItemToggled)
+        self.todo_list.itemDeleted.connect(self.onItemDeleted)
+        self.todo_list.itemRenamed.connect(self.onItemRenamed)
+        self.todo_list.reminderRequested.connect(self.onReminderRequested)
         self.template_combo.currentTextChanged.connect(self.onTemplateSelected)
+        self.search_line.textChanged.connect(self.onSearchChanged)
+        self.filter_combo.currentIndexChanged.connect(self.applyFilter)
+        self.updateListCombo()
+        self.list_combo.activated.connect(self.onListSelected)
+        
+        # 加载数据（后台读取，分批插入）
+        self.loadDataAsync()
+    
+    def openSession(self, name):
+        """打开一个列表（还没有加载待办）"""
+        session = TodoListSession(name, self.data_dir, self.config, self.snapshotData, parent=self)
+        session.save_scheduler.saveFailed.connect(self.onSaveFailed)
+        session.reminders.remindersDue.connect(lambda fired: self.onRemindersDue(session, fired))
+        return session
+    
+    def updateListCombo(self):
+        """刷新列表下拉框并选中当前列表"""
+        blocked = self.list_combo.blockSignals(True)
+        self.list_combo.clear()
+        self.list_combo.addItems(list_names(self.data_dir))
+        self.list_combo.setCurrentText(self.session.name)
+        self.list_combo.blockSignals(blocked)
+    
+    def onListSelected(self, index):
+        """在下拉框中选择了列表"""
+        self.switchList(self.list_combo.itemText(index))
+        # 切换失败时恢复选中项
+        self.updateListCombo()
+    
+    def createList(self):
+        """新建列表并切换过去"""
+        name, ok = QInputDialog.getText(self, "新建列表", "列表名称:")
+        if not ok or not name.strip():
+            return
+        try:
+            name = create_list(self.data_dir, name)
+        except (OSError, ValueError) as e:
+            self.status_bar.showMessage(f"无法新建列表: {e}", 5000)
+            return
+        self.switchList(name)
+        self.updateListCombo()
+    
+    @profiled("switchList")
+    def switchList(self, name):
+        """切换到另一个列表，返回是否已切换
+        
+        缓存中的列表直接换上已加载的模型，其余的打开后在后台加载；只有当前列表显示在界面上。
+        """
+        if name == self.session.name:
+            return True
+        if self.transfer_task is not None:
+            self.status_bar.showMessage("导入导出进行中，暂不能切换列表", 3000)
+            return False
+        # 缓存中的列表都是完整加载的
+        self.ensureLoaded()
+        if name in self.session_loaders:
+            # 命令行正在后台加载这个列表：先同步加载完，它会进入缓存
+            self.session_loaders[name][0].finish()
+        session = self.sessions.pop(name, None)
+        if session is None:
+            try:
+                session = self.openSession(name)
+            except Exception as e:
+                self.status_bar.showMessage(f"无法打开列表 {name}: {e}", 5000)
+                return False
+        self.sessions[name] = session
+        self.session = session
+        try:
+            save_active_list(self.data_dir, name)
+        except OSError as e:
+            print(f"无法记录当前列表: {e}")
+        self.attachSession()
+        self.evictSessions()
+        return True
+    
+    def attachSession(self):
+        """界面换成当前列表：已加载的补上不在前台时的外部修改，未加载的后台加载"""
+        session = self.session
+        self.todo_list.setTodoModel(session.model)
+        self.todo_list.archive = session.archive
+        self.updateListCombo()
+        if session.loaded:
+            self.status_bar.showMessage(f"已切换到列表: {session.name}（{session.model.rowCount()} 项）", 3000)
+            self.syncExternalChanges()
+        else:
+            self.loadDataAsync()
+    
+    def evictSessions(self):
+        """卸载最久没用的列表，直到缓存的列表数和待办总数都在限额内（当前列表不卸载）"""
+        inactive = [session for session in self.sessions.values() if session is not self.session]
+        total = sum(session.model.rowCount() for session in self.sessions.values())
+        while inactive and (len(inactive) > LIST_CACHE_SIZE or total > LIST_CACHE_MAX_TODOS):
+            session = inactive.pop(0)
+            total -= session.model.rowCount()
+            del self.sessions[session.name]
+            session.close()
+            session.deleteLater()
     
     def onPetClicked(self):
         """宠物被点击"""
+        # 表情随列表保存（关闭时不再无条件保存）
+        self.save_scheduler.schedule()
         self.status_bar.showMessage("宠物表情已切换", 2000)
     
     def onTemplateSelected(self, text):
@@ -348,6 +2003,89 @@ class MainWindow(QMainWindow):
         self.input_line.setText(text)
         self.input_line.setFocus()
     
+    def onSearchChanged(self, text):
+        """搜索框内容改变：小列表立即过滤，大列表防抖，只有一个字母或数字时等得更久"""
+        if self.todo_list.count() <= SEARCH_DEBOUNCE_THRESHOLD:
+            delay = 0
+        elif len(text.strip()) == 1 and text.strip().isascii():
+            delay = SEARCH_SHORT_QUERY_DEBOUNCE_MS
+        else:
+            delay = SEARCH_DEBOUNCE_MS
+        self.search_timer.start(delay)
+    
+    def importTodos(self):
+        """选择文件并分块导入"""
+        if self.transfer_task is not None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "导入待办", "", "待办文件 (*.jsonl *.ndjson *.csv)")
+        if path:
+            self.importFile(path)
+    
+    def importFile(self, path, fmt=None):
+        """分块导入文件"""
+        if self.transfer_task is not None:
+            self.status_bar.showMessage("已有导入导出任务在进行", 3000)
+            return
+        self.ensureLoaded()
+        try:
+            task = TodoImporter(self.todo_list, path, fmt, parent=self)
+        except (OSError, ValueError) as e:
+            self.status_bar.showMessage(f"无法导入: {e}", 5000)
+            return
+        task.chunkAdded.connect(self.save_scheduler.scheduleMany)
+        self.startTransfer(task)
+    
+    def exportTodos(self):
+        """选择文件并分块导出"""
+        if self.transfer_task is not None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出待办", "todos.jsonl", "JSONL (*.jsonl);;CSV (*.csv)")
+        if path:
+            self.exportFile(path)
+    
+    def exportFile(self, path, fmt=None):
+        """分块导出到文件"""
+        if self.transfer_task is not None:
+            self.status_bar.showMessage("已有导入导出任务在进行", 3000)
+            return
+        self.ensureLoaded()
+        try:
+            task = TodoExporter(self.todo_list, path, fmt, parent=self)
+        except (OSError, ValueError) as e:
+            self.status_bar.showMessage(f"无法导出: {e}", 5000)
+            return
+        self.startTransfer(task)
+    
+    def startTransfer(self, task):
+        """开始导入导出任务，期间显示进度条"""
+        self.transfer_task = task
+        self.import_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        task.progress.connect(self.progress_bar.setValue)
+        task.finished.connect(self.onTransferFinished)
+        task.failed.connect(lambda message: self.onTransferFinished(f"导入导出失败: {message}"))
+        task.start()
+    
+    def onTransferFinished(self, message):
+        """导入导出结束"""
+        self.transfer_task.deleteLater()
+        self.transfer_task = None
+        self.import_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.progress_bar.hide()
+        self.status_bar.showMessage(message, 5000)
+    
+    @profiled("applyFilter")
+    def applyFilter(self):
+        """按搜索框和过滤状态刷新列表"""
+        self.search_timer.stop()
+        self.todo_list.setFilter(self.search_line.text(), self.filter_combo.currentData())
+        if self.todo_list.isFiltered():
+            self.status_bar.showMessage(f"显示 {self.todo_list.visibleCount()} / {self.todo_list.count()} 项", 2000)
+    
+    @profiled("addTodo")
     def addTodo(self):
         """添加待办项"""
         text = self.input_line.text().strip()
@@ -355,77 +2093,502 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("待办内容不能为空", 3000)
             return
         
+        # 查重需要完整的列表
+        self.ensureLoaded()
         if self.todo_list.add_todo(text):
             self.input_line.clear()
-            self.status_bar.showMessage(f"已添加: {text}", 3000)
-            self.saveData()
+            row = self.todo_list.count() - 1
+            title = self.todo_list.todo_model.title(row)
+            self.saveData({"op": "add", "title": title, "done": False})
+            minutes = TEMPLATE_REPEAT_MINUTES.get(title)
+            if minutes:
+                self.setReminder(self.session, row, time.time() + minutes * 60, minutes * 60)
+                self.status_bar.showMessage(f"已添加: {text}（每 {minutes} 分钟提醒）", 3000)
+            else:
+                self.status_bar.showMessage(f"已添加: {text}", 3000)
+        elif self.archive.contains(text):
+            self.status_bar.showMessage(f"历史记录中已有: {text}", 3000)
         else:
             self.status_bar.showMessage(f"待办已存在: {text}", 3000)
     
-    def onItemToggled(self, item, checked):
+    @profiled("onItemToggled")
+    def onItemToggled(self, row, checked):
         """待办项状态改变"""
-        widget = self.todo_list.itemWidget(item)
-        if widget and checked:
+        if checked:
             self.pet_widget.setHappyTemporarily(1500)
             self.status_bar.showMessage("完成了一项任务!", 2000)
         
-        self.saveData()
+        title = self.todo_list.todo_model.title(row)
+        self.archive.note_done(title, checked)
+        self.saveData({"op": "toggle", "title": title, "done": checked})
     
-    def loadData(self):
-        """加载数据"""
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 加载待办事项
-                todos = data.get("todos", [])
-                for todo in todos:
-                    self.todo_list.add_todo(todo["title"], todo["done"])
-                
-                # 加载上次的表情
-                last_emotion = data.get("lastEmotion", "normal")
-                self.pet_widget.setEmotion(last_emotion)
-                
-                self.status_bar.showMessage(f"已加载 {len(todos)} 个待办事项", 3000)
+    def onItemDeleted(self, title):
+        """待办项被删除"""
+        self.status_bar.showMessage(f"已删除: {title}", 3000)
+        self.saveData({"op": "delete", "title": title})
+    
+    def onItemRenamed(self, old_title, new_title):
+        """待办项被重命名"""
+        self.status_bar.showMessage(f"已重命名: {old_title} → {new_title}", 3000)
+        self.saveData({"op": "rename", "title": old_title, "new": new_title})
+    
+    def onReminderRequested(self, row, cancel):
+        """右键菜单设置或取消当前列表某项的提醒"""
+        model = self.todo_list.todo_model
+        title = model.title(row)
+        if cancel:
+            self.setReminder(self.session, row, None)
+            self.status_bar.showMessage(f"已取消提醒: {title}", 3000)
+            return
+        todo = model.store().at(row)
+        dialog = ReminderDialog(title, todo.due, todo.every, parent=self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        # 对话框期间列表可能被外部修改，按记录 ID 重新定位
+        row = model.rowOfId(todo.id)
+        if row >= 0 and self.setReminder(self.session, row, dialog.due(), dialog.every()):
+            self.status_bar.showMessage(f"{title}: {describeReminder(dialog.due(), dialog.every())}", 3000)
+    
+    def setReminder(self, session, row, due, every=0):
+        """设置或取消（due 为 None）某个列表中一项的提醒：写到待办记录上，由保存调度器保存"""
+        model = session.model
+        if not model.setReminder(row, due, every):
+            return False
+        todo = model.store().at(row)
+        session.reminders.set(todo.id, todo.due, todo.every)
+        session.save_scheduler.schedule({"op": "remind", "title": todo.title, "due": todo.due, "every": todo.every})
+        return True
+    
+    def onRemindersDue(self, session, fired):
+        """提醒到期：重复任务改回未完成并记下下次到期时间，宠物做出反应（缓存中不在前台的列表同样处理）"""
+        model = session.model
+        shown, changes = [], []
+        for todo_id, next_due in fired:
+            row = model.rowOfId(todo_id)
+            if row < 0:
+                continue
+            title = model.title(row)
+            if model.isDone(row):
+                model.setData(model.index(row), Qt.Unchecked, Qt.CheckStateRole)
+                session.archive.note_done(title, False)
+                changes.append({"op": "toggle", "title": title, "done": False})
+            todo = model.store().at(row)
+            if model.setReminder(row, next_due, todo.every):
+                changes.append({"op": "remind", "title": title, "due": todo.due, "every": todo.every})
+            shown.append(title)
+        if changes:
+            session.save_scheduler.scheduleMany(changes)
+        if not shown:
+            return
+        self.pet_widget.setEmotionTemporarily("curious", REMINDER_EMOTION_MS)
+        more = f" 等 {len(shown)} 项" if len(shown) > 3 else ""
+        where = "" if session is self.session else f"（{session.name}）"
+        self.status_bar.showMessage(f"提醒{where}: {'、'.join(shown[:3])}{more}", 10000)
+    
+    def handleCommand(self, request, respond):
+        """处理命令行发来的请求并通过 respond 回复：变更增量应用到列表，由保存调度器照常保存
+        
+        命令行指定的列表不必是界面上的当前列表，界面不会因此切换；
+        不在缓存中的列表先在后台分批加载，加载完再处理请求并回复。
+        """
+        self.buildTodoPanel()
+        cmd = request.get("cmd")
+        if cmd in ("list", "apply"):
+            name = request.get("list", DEFAULT_LIST)
+            try:
+                session = self.commandSession(name)
+            except Exception as e:
+                respond({"ok": False, "error": f"无法打开列表 {name}: {e}"})
+                return
+            if session is None:
+                respond({"ok": False, "error": f"列表不存在: {name}"})
+            elif name in self.session_loaders:
+                self.session_loaders[name][1].append((request, respond))
             else:
-                self.status_bar.showMessage("欢迎使用桌面宠物待办事项工具", 3000)
-        except Exception as e:
-            self.status_bar.showMessage(f"加载数据时出错: {str(e)}", 5000)
-            print(f"加载错误: {e}")
+                respond(self.runCommand(session, request))
+                # 为命令行临时加载的列表也受缓存限额约束（修改已交给它的保存调度器）
+                self.evictSessions()
+            return
+        if cmd == "activate":
+            self.activate(request.get("argv", []), request.get("cwd", os.getcwd()))
+            respond({"ok": True})
+            return
+        respond({"ok": False, "error": f"未知命令: {cmd}"})
+    
+    def runCommand(self, session, request):
+        """在已加载的列表上执行 list / apply 请求，返回回复"""
+        if request["cmd"] == "list":
+            todos = session.model.todos()
+            if request.get("done") is not None:
+                todos = [todo for todo in todos if todo["done"] == request["done"]]
+            return {"ok": True, "todos": todos}
+        results = [self.applyChange(session, change) for change in request["changes"]]
+        where = "" if session is self.session else f"（{session.name}）"
+        self.status_bar.showMessage(f"已应用命令行的 {results.count('ok')} 项修改{where}", 3000)
+        return {"ok": True, "results": results}
+    
+    def activate(self, argv, cwd):
+        """再次启动时由新进程转交过来：显示窗口，并执行它的命令行参数"""
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        parser = argparse.ArgumentParser(add_help=False)
+        transfer.add_arguments(parser)
+        args, _ = parser.parse_known_args(argv)
+        # 相对路径按新进程的工作目录解析
+        if args.import_path:
+            self.importFile(os.path.join(cwd, args.import_path), args.format)
+        elif args.export_path:
+            self.exportFile(os.path.join(cwd, args.export_path), args.format)
     
-    def saveData(self):
-        """保存数据"""
+    def watchDataFiles(self):
+        """监视数据目录：其他进程修改数据文件后增量同步到列表"""
+        if not hasattr(self, "file_watcher"):
+            self.file_watcher = QtCore.QFileSystemWatcher(self)
+            self.file_watcher.fileChanged.connect(self.onDataFileChanged)
+            # 原子替换后文件监视会失效，同时监视目录
+            self.file_watcher.directoryChanged.connect(self.onDataFileChanged)
+            self.watch_timer = QtCore.QTimer(self)
+            self.watch_timer.setSingleShot(True)
+            self.watch_timer.setInterval(WATCH_DELAY_MS)
+            self.watch_timer.timeout.connect(self.syncExternalChanges)
+        # 只监视当前列表，切换列表后换掉之前的路径
+        wanted = [path for path in [self.session.dir] + self.storage.watch_paths() if os.path.exists(path)]
+        watched = set(self.file_watcher.files()) | set(self.file_watcher.directories())
+        stale = [path for path in watched if path not in wanted]
+        if stale:
+            self.file_watcher.removePaths(stale)
+        paths = [path for path in wanted if path not in watched]
+        if paths:
+            self.file_watcher.addPaths(paths)
+    
+    def onDataFileChanged(self, path):
+        """数据文件或目录变化（包括本进程自己的保存），稍后统一检查"""
+        self.watch_timer.start()
+    
+    def syncExternalChanges(self):
+        """读取其他进程的修改并增量应用，不重新加载整个列表"""
+        if self.todo_loader is not None:
+            # 切换后的列表还在加载，加载完再检查
+            self.watch_timer.start()
+            return
+        self.watchDataFiles()
         try:
-            data = {
-                "todos": self.todo_list.get_all_todos(),
-                "lastEmotion": self.pet_widget.getEmotion()
-            }
-            
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            changes = self.storage.poll()
         except Exception as e:
-            self.status_bar.showMessage(f"保存数据时出错: {str(e)}", 5000)
-            print(f"保存错误: {e}")
+            print(f"同步外部修改失败: {e}")
+            return
+        if changes is None:
+            # 落后太多，无法增量同步：清空后重新加载（加载完后重新开始提醒计时）
+            self.todo_list.clear_all()
+            self.loadDataAsync()
+            return
+        for change in changes:
+            self.applyExternalChange(change)
+        if changes:
+            self.status_bar.showMessage(f"已同步 {len(changes)} 项外部修改", 3000)
+    
+    def applyExternalChange(self, change):
+        """应用已经保存过的外部变更：直接改模型，不触发保存"""
+        model = self.todo_list.todo_model
+        op = change["op"]
+        if op == "add":
+            self.todo_list.add_todo(change["title"], change.get("done", False))
+        elif op == "emotion":
+            self.pet_widget.setEmotion(change["value"])
+        elif op == "clear":
+            self.todo_list.clear_all()
+        else:
+            row = model.rowOf(change["title"])
+            if row < 0:
+                return
+            if op == "toggle":
+                model.setData(model.index(row), Qt.Checked if change["done"] else Qt.Unchecked, Qt.CheckStateRole)
+            elif op == "delete":
+                model.remove(row)
+            elif op == "rename":
+                model.rename(row, change["new"])
+            elif op == "remind":
+                if model.setReminder(row, change.get("due"), change.get("every", 0)):
+                    todo = model.store().at(row)
+                    self.reminders.set(todo.id, todo.due, todo.every)
+    
+    def commandSession(self, name):
+        """命令行要操作的列表，不存在时返回 None
+        
+        当前列表先等后台加载完；其他列表从缓存中取，不在缓存中的打开后用 SessionLoader 在后台加载
+        （仍在 self.session_loaders 中），不显示到界面上，也不改变当前列表。
+        """
+        if name == self.session.name:
+            self.ensureLoaded()
+            return self.session
+        session = self.sessions.get(name)
+        if session is not None:
+            return session
+        if name in self.session_loaders:
+            return self.session_loaders[name][0].session
+        if name not in list_names(self.data_dir):
+            return None
+        session = self.openSession(name)
+        loader = SessionLoader(session, parent=self)
+        loader.finished.connect(lambda message: self.onSessionLoaded(name))
+        loader.failed.connect(lambda message: self.onSessionLoadFailed(name, message))
+        self.session_loaders[name] = (loader, [])
+        loader.start()
+        return session
+    
+    def onSessionLoaded(self, name):
+        """命令行要操作的列表加载完：放进缓存，处理等待中的请求"""
+        loader, pending = self.session_loaders.pop(name)
+        loader.deleteLater()
+        session = loader.session
+        session.loaded = True
+        session.reminders.start()
+        self.buildSearchIndex(session)
+        # 放在缓存最久未用的一端，最先被卸载
+        self.sessions[name] = session
+        self.sessions.move_to_end(name, last=False)
+        for request, respond in pending:
+            respond(self.runCommand(session, request))
+        self.evictSessions()
+    
+    def onSessionLoadFailed(self, name, message):
+        """命令行要操作的列表加载失败：关闭它，等待中的请求都回复错误"""
+        loader, pending = self.session_loaders.pop(name)
+        loader.deleteLater()
+        loader.session.close()
+        loader.session.deleteLater()
+        for request, respond in pending:
+            respond({"ok": False, "error": f"无法打开列表 {name}: {message}"})
+    
+    def applyChange(self, session, change):
+        """把一条外部变更应用到某个列表并保存，返回 ok / exists / missing
+        
+        直接修改列表的模型（不经过界面上的列表控件），列表不在前台时同样适用。
+        """
+        model, archive = session.model, session.archive
+        op = change["op"]
+        if op == "add":
+            batch = dedupeTodos(model, archive, [change])
+            if not batch:
+                return "exists"
+            model.append(batch[0]["title"], batch[0]["done"])
+            session.save_scheduler.schedule({"op": "add", **batch[0]})
+            return "ok"
+        
+        row = model.rowOf(change["title"])
+        if row < 0:
+            return "missing"
+        title = model.title(row)
+        if op == "toggle":
+            done = bool(change["done"])
+            if model.isDone(row) != done:
+                model.setData(model.index(row), Qt.Checked if done else Qt.Unchecked, Qt.CheckStateRole)
+                archive.note_done(title, done)
+                session.save_scheduler.schedule({"op": "toggle", "title": title, "done": done})
+        elif op == "delete":
+            model.remove(row)
+            session.save_scheduler.schedule({"op": "delete", "title": title})
+        elif op == "rename":
+            new_title = change["new"].strip()
+            if new_title == title:
+                return "ok"
+            if not new_title or archive.contains(new_title) or not model.rename(row, new_title):
+                return "exists"
+            session.save_scheduler.schedule({"op": "rename", "title": title, "new": new_title})
+        return "ok"
+    
+    def loadDataAsync(self):
+        """在工作线程读取数据，先显示第一屏，其余每轮事件循环插入一批"""
+        # 加载完成前不能重命名，以免与尚未插入的待办重名
+        self.todo_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.todo_loader = TodoLoader(self.todo_list, self.storage, parent=self)
+        self.todo_loader.dataRead.connect(self.onDataRead)
+        self.todo_loader.rowsLoaded.connect(self.onRowsLoaded)
+        self.todo_loader.finished.connect(self.onLoadFinished)
+        self.todo_loader.failed.connect(self.onLoadFailed)
+        self.todo_loader.start()
+    
+    def onDataRead(self, data):
+        """数据已读取，待办插入之前先恢复表情"""
+        if data is not None:
+            self.pet_widget.setEmotion(data.get("lastEmotion", "normal"))
+    
+    def onRowsLoaded(self, loaded, total):
+        """插入了一批待办"""
+        if loaded < total:
+            self.status_bar.showMessage(f"正在加载 {loaded}/{total}")
+    
+    def onLoadFailed(self, message):
+        """读取存储失败"""
+        print(f"加载错误: {message}")
+        self.onLoadFinished(f"加载数据时出错: {message}", 5000)
+    
+    def onLoadFinished(self, message, timeout=3000):
+        """全部待办已插入（或加载失败）"""
+        self.todo_loader.deleteLater()
+        self.todo_loader = None
+        self.session.loaded = True
+        self.todo_list.setEditTriggers(QAbstractItemView.EditKeyPressed)
+        self.status_bar.showMessage(message, timeout)
+        self.watchDataFiles()
+        self.archiveDoneTodos()
+        self.reminders.start()
+        self.buildSearchIndex(self.session)
+        if not hasattr(self, "archive_timer"):
+            self.archive_timer = QtCore.QTimer(self)
+            self.archive_timer.timeout.connect(self.archiveDoneTodos)
+            self.archive_timer.start(ARCHIVE_INTERVAL_MS)
+            # 启动耗时只在第一次加载（启动时的列表）后记录
+            STARTUP.mark("data_loaded")
+            try:
+                STARTUP.save(os.path.join(self.data_dir, "startup.jsonl"))
+            except OSError as e:
+                print(f"无法记录启动耗时: {e}")
+    
+    @profiled("archiveDoneTodos")
+    def archiveDoneTodos(self):
+        """把完成超过 archive_after_days 天的待办移到归档（0 表示不归档）"""
+        days = self.config.get("archive_after_days", 0)
+        if not days or self.todo_loader is not None or self.transfer_task is not None:
+            return
+        due = self.archive.due(self.todo_list.get_all_todos(), days * 24 * 3600)
+        try:
+            self.archive.append(due)
+        except OSError as e:
+            self.status_bar.showMessage(f"归档失败: {e}", 5000)
+            return
+        if not due:
+            return
+        # 已写入归档（包括上次中断时写过的）才从列表删除
+        self.todo_list.remove_todos([todo["title"] for todo in due])
+        self.save_scheduler.scheduleMany([{"op": "delete", "title": todo["title"]} for todo in due])
+        self.status_bar.showMessage(f"已归档 {len(due)} 项已完成的待办", 3000)
+    
+    def buildSearchIndex(self, session):
+        """列表加载完后在空闲时建立搜索索引（随列表一起卸载）"""
+        builder = SearchIndexBuilder(session.model, parent=session)
+        builder.finished.connect(builder.deleteLater)
+        builder.start()
+    
+    def showHistory(self):
+        """分页查看已归档的待办"""
+        HistoryDialog(self.archive, parent=self).exec()
+    
+    def ensureLoaded(self):
+        """后台加载还没结束时，等它读完并同步插入剩余的待办"""
+        if self.todo_loader is not None:
+            self.todo_loader.finish()
+    
+    @profiled("saveData")
+    def saveData(self, change=None):
+        """保存数据 - 只记录变更，由保存调度器合并后在后台写盘"""
+        self.save_scheduler.schedule(change)
+    
+    def snapshotData(self, session):
+        """获取某个列表要保存的数据快照（日志存储只需要表情，待办通过变更记录保存）
+        
+        整文件存储的列表还没加载时返回 None，这次不保存。
+        """
+        data = {"lastEmotion": self.pet_widget.getEmotion()}
+        if session.storage.needs_snapshot:
+            if session is self.session:
+                self.ensureLoaded()
+            if not session.loaded:
+                # 待办还没加载（比如面板还没构建就退出）：不能用空列表覆盖磁盘上的数据
+                return None
+            data["todos"] = session.model.todos()
+        return data
+    
+    def onSaveFailed(self, message):
+        """后台保存失败"""
+        self.status_bar.showMessage(f"保存数据时出错: {message}", 5000)
+        print(f"保存错误: {message}")
     
     def closeEvent(self, event):
-        """关闭事件 - 保存数据"""
-        self.saveData()
+        """关闭事件 - 同步写出未保存的数据"""
+        if self.transfer_task is not None:
+            # 已导入的部分照常保存，未完成的导出文件丢弃
+            self.transfer_task.cancel()
+        if self.todo_loader is not None:
+            # 整文件存储要保存完整列表，需要先加载完；其余存储停止插入即可
+            if self.storage.needs_snapshot:
+                self.ensureLoaded()
+            else:
+                self.todo_loader.cancel()
+        for loader, pending in self.session_loaders.values():
+            # 等待中的请求还没有应用，列表直接关闭（没加载完的整文件存储不会被保存）
+            loader.cancel()
+            loader.session.close()
+        if hasattr(self, "file_watcher"):
+            # 存储即将关闭，不再同步外部修改
+            self.file_watcher.blockSignals(True)
+            self.watch_timer.stop()
+        for session in self.sessions.values():
+            session.close()
+        if PROFILING_ENABLED:
+            self.watchdog.stop()
+            self.dumpProfile()
         event.accept()
 
+def setApplicationInfo():
+    """设置应用程序信息（决定数据目录位置，可在创建 QApplication 之前调用）"""
+    QtCore.QCoreApplication.setApplicationName(APP_NAME)
+    QtCore.QCoreApplication.setApplicationVersion("1.0")
+    QtCore.QCoreApplication.setOrganizationName(ORGANIZATION_NAME)
+
+def appDataDir():
+    """数据目录，不存在时创建"""
+    data_dir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation)
+    if not data_dir:
+        data_dir = os.path.expanduser("~/.DeskPetTodo")
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
 def main():
     """主函数"""
-    app = QApplication(sys.argv)
-    
     # 设置应用程序信息
-    app.setApplicationName("桌面宠物待办事项")
-    app.setApplicationVersion("1.0")
-    app.setOrganizationName("个人使用")
+    setApplicationInfo()
+    data_dir = appDataDir()
+    
+    # 单实例：已有窗口在运行时把参数（包括 --import / --export）转交给它，然后退出
+    try:
+        reply = send_request(data_dir, {"cmd": "activate", "argv": sys.argv[1:], "cwd": os.getcwd()})
+    except (OSError, ValueError):
+        reply = None
+    if reply is not None:
+        sys.exit(0 if reply.get("ok") else 1)
+    
+    # 运行期间持有数据目录锁：命令行据此改走本地套接字，第二个窗口也不会同时写数据
+    lock = FileLock(os.path.join(data_dir, LOCK_FILE))
+    if not lock.acquire(timeout=LOCK_WAIT_S):
+        print("数据目录正被其他进程使用")
+        sys.exit(1)
+    
+    # 命令行导入导出：不创建窗口
+    if any(arg.split("=")[0] in ("--import", "--export") for arg in sys.argv[1:]):
+        code = transfer.main(sys.argv[1:], data_dir, legacy_files=LEGACY_TODO_FILES)
+        lock.release()
+        sys.exit(code)
+    
+    app = QApplication(sys.argv)
+    STARTUP.mark("app")
     
-    window = MainWindow()
+    # 快速启动：先显示宠物，待办面板和数据随后构建
+    window = MainWindow(lazy_panel=True)
+    try:
+        server = CommandServer(server_path(data_dir), window.handleCommand, parent=window)
+    except OSError as e:
+        print(f"无法创建套接字目录: {e}")
+        server = None
+    if server is None or not server.listen():
+        print("无法监听本地套接字，再次启动和命令行修改将无法交给本窗口")
     window.show()
+    STARTUP.mark("window_shown")
     
-    sys.exit(app.exec())
+    code = app.exec()
+    lock.release()
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# 先运行 python assetbundle.py 生成预缩放的资源包，打包时只带资源包，不带散装 PNG。
+# 资源包是未压缩的像素（约 10 MB，散装 PNG 约 450 KB），所以用单目录打包：
+# 运行时直接从安装目录映射，不必像单文件 EXE 那样每次启动都解压到临时目录
+if os.path.exists(os.path.join('assets', 'pet.bundle')):
+    datas = [(os.path.join('assets', 'pet.bundle'), 'assets')]
+else:
+    datas = [('assets', 'assets')]
 
 a = Analysis(
     ['test.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets')],
+    datas=datas,
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -19,16 +27,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='test',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +41,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='test',
+)
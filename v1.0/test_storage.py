@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+import unittest
+
+from storage import JournalStorage
+
+# 日志存储的崩溃恢复：python -m unittest test_storage
+
+
+class JournalRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix="todoneko-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def open_storage(self):
+        storage = JournalStorage(self.data_dir)
+        storage.load()
+        return storage
+
+    def add(self, storage, title):
+        storage.save({}, [{"op": "add", "title": title, "done": False}])
+
+    def titles(self):
+        storage = JournalStorage(self.data_dir)
+        try:
+            data = storage.load()
+        finally:
+            storage.close()
+        return [todo["title"] for todo in data["todos"]]
+
+    def test_cut_off_journal_then_more_saves(self):
+        storage = self.open_storage()
+        self.add(storage, "A")
+        storage.close()
+        # 崩溃：最后一条记录只写了一半
+        with open(storage.journal_file, 'ab') as f:
+            f.write(b'{"op": "add", "title": "lo')
+
+        storage = self.open_storage()
+        self.add(storage, "B")
+        self.add(storage, "C")
+        storage.close()
+        self.assertEqual(self.titles(), ["A", "B", "C"])
+        # 之后的重启同样能读到全部记录
+        self.assertEqual(self.titles(), ["A", "B", "C"])
+
+    def test_broken_line_followed_by_records(self):
+        storage = self.open_storage()
+        self.add(storage, "A")
+        storage.close()
+        # 半行后面已经接上了其他记录（之前的版本会这样追加）
+        with open(storage.journal_file, 'ab') as f:
+            f.write(b'{"op": "add", "title": "lo{"op": "add", "title": "B", "done": false, "seq": 2}\n')
+            f.write(b'{"op": "add", "title": "C", "done": false, "seq": 3}\n')
+        self.assertEqual(self.titles(), ["A", "C"])
+
+        storage = self.open_storage()
+        self.add(storage, "D")
+        storage.close()
+        self.assertEqual(self.titles(), ["A", "C", "D"])
+
+
+if __name__ == "__main__":
+    unittest.main()
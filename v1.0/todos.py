@@ -0,0 +1,234 @@
+from storage import normalize_title
+
+# 内存中的待办记录（不依赖 Qt）：界面和保存都从这里读，不再经过控件
+#
+# 每条记录有一个进程内稳定的整数 ID，按 ID 和规范化标题查找都是 O(1)。
+#
+# 行号不逐条维护：每条记录追加时分到一个递增的槽位，删除只把槽位标记为空。
+# 没有删除过时行号就是槽位；删除过之后用树状数组（Fenwick）统计槽位之前的有效记录数，
+# 删除和查询行号都是 O(log N)。末尾追加不影响已有记录的行号，树状数组只在需要时补上
+# 新槽位；空槽位多于有效记录时重新分配槽位（均摊 O(1)）。
+
+
+class Todo:
+    """一条待办记录"""
+    __slots__ = ("id", "title", "done", "due", "every")
+
+    def __init__(self, todo_id, title, done=False, due=None, every=0):
+        self.id = todo_id
+        self.title = title
+        self.done = bool(done)
+        # 提醒：到期时间戳（None 表示没有提醒）和重复间隔秒
+        self.due = due
+        self.every = every if due is not None else 0
+
+    def to_dict(self):
+        data = {"title": self.title, "done": self.done}
+        if self.due is not None:
+            data["due"] = self.due
+            data["every"] = self.every
+        return data
+
+
+class TodoStore:
+    """按显示顺序保存的待办记录，调用方负责查重"""
+
+    def __init__(self):
+        self._by_id = {}
+        # 规范化标题 -> 记录
+        self._by_key = {}
+        self._order = []
+        # ID -> 槽位；_alive[槽位] 为 1 表示记录还在
+        self._slots = {}
+        self._alive = bytearray()
+        self._dead = 0
+        # 前 _tree_size 个槽位的树状数组（下标从 1 开始），没有删除过时为 None；
+        # _tree_alive 是其中的有效记录数，之后的槽位都是有效的
+        self._tree = None
+        self._tree_size = 0
+        self._tree_alive = 0
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def keys(self):
+        """所有规范化标题"""
+        return self._by_key.keys()
+
+    def get(self, todo_id):
+        """按 ID 查找，不存在返回 None"""
+        return self._by_id.get(todo_id)
+
+    def find(self, title):
+        """按规范化标题查找，不存在返回 None"""
+        return self._by_key.get(normalize_title(title))
+
+    def find_key(self, key):
+        """按已规范化的标题查找"""
+        return self._by_key.get(key)
+
+    def at(self, row):
+        """指定行的记录"""
+        return self._order[row]
+
+    def row(self, todo_id):
+        """记录当前的行号，不存在返回 -1"""
+        slot = self._slots.get(todo_id)
+        if slot is None:
+            return -1
+        if self._tree is None:
+            return slot
+        if slot >= self._tree_size:
+            return self._tree_alive + slot - self._tree_size
+        # 槽位之前的有效记录数
+        row = 0
+        i = slot
+        tree = self._tree
+        while i > 0:
+            row += tree[i]
+            i &= i - 1
+        return row
+
+    def _build_tree(self):
+        """按 _alive 线性建立覆盖全部槽位的树状数组"""
+        n = len(self._alive)
+        tree = [0]
+        tree += self._alive
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._tree_size = n
+        self._tree_alive = n - self._dead
+
+    def _extend_tree(self):
+        """让树状数组覆盖追加的新槽位（新槽位都是有效的）"""
+        n = len(self._alive)
+        added = n - self._tree_size
+        if self._tree is None or added * 8 > n:
+            self._build_tree()
+            return
+        tree = self._tree
+        for i in range(self._tree_size + 1, n + 1):
+            # 节点 i 覆盖 (i - lowbit(i), i]：新槽位本身加上前面那段的有效记录数
+            low = i - (i & -i)
+            total = 1
+            j = i - 1
+            while j > low:
+                total += tree[j]
+                j -= j & -j
+            tree.append(total)
+        self._tree_size = n
+        self._tree_alive += added
+
+    def _compact(self):
+        """按显示顺序重新分配槽位，丢掉空槽位"""
+        self._slots = {todo.id: row for row, todo in enumerate(self._order)}
+        self._alive = bytearray(b"\x01") * len(self._order)
+        self._dead = 0
+        self._tree = None
+        self._tree_size = 0
+        self._tree_alive = 0
+
+    def rows_of_keys(self, keys):
+        """一组规范化标题对应的行号（升序）
+
+        命中的记录多时按显示顺序扫描一遍，比逐个查行号再排序快得多（搜索很短的词时）。
+        """
+        if len(keys) >= len(self._order):
+            return list(range(len(self._order)))  # 全部命中
+        if len(keys) * 8 < len(self._order):
+            return sorted(self.row(self._by_key[key].id) for key in keys)
+        matched = {self._by_key[key].id for key in keys}
+        return [row for row, todo in enumerate(self._order) if todo.id in matched]
+
+    def add(self, title, done=False, due=None, every=0):
+        """在末尾追加一条记录并返回它"""
+        todo = Todo(self._next_id, title, done, due, every)
+        self._next_id += 1
+        self._order.append(todo)
+        self._by_id[todo.id] = todo
+        self._by_key[normalize_title(title)] = todo
+        # 末尾追加：已有记录的行号不变，树状数组等到删除新槽位时再补
+        self._slots[todo.id] = len(self._alive)
+        self._alive.append(1)
+        return todo
+
+    def pop(self, row):
+        """删除指定行并返回被删除的记录"""
+        todo = self._order.pop(row)
+        del self._by_id[todo.id]
+        del self._by_key[normalize_title(todo.title)]
+        slot = self._slots.pop(todo.id)
+        if self._dead + 1 > len(self._order) + 64:
+            self._compact()
+            return todo
+        if slot >= self._tree_size:
+            self._extend_tree()
+        self._alive[slot] = 0
+        self._dead += 1
+        # 后面的行号前移：只更新树状数组中覆盖该槽位的 O(log N) 个节点
+        tree = self._tree
+        i = slot + 1
+        while i <= self._tree_size:
+            tree[i] -= 1
+            i += i & -i
+        self._tree_alive -= 1
+        return todo
+
+    def remove(self, todo_id):
+        """按 ID 删除，返回原来的行号（不存在返回 -1）"""
+        row = self.row(todo_id)
+        if row >= 0:
+            self.pop(row)
+        return row
+
+    def rename(self, todo_id, title):
+        """修改标题，新标题与其他记录重复时返回 False"""
+        todo = self._by_id[todo_id]
+        old_key, new_key = normalize_title(todo.title), normalize_title(title)
+        if self._by_key.get(new_key, todo) is not todo:
+            return False
+        del self._by_key[old_key]
+        self._by_key[new_key] = todo
+        todo.title = title
+        return True
+
+    def set_done(self, todo_id, done):
+        """修改完成状态，没有变化时返回 False"""
+        todo = self._by_id[todo_id]
+        done = bool(done)
+        if todo.done == done:
+            return False
+        todo.done = done
+        return True
+
+    def set_reminder(self, todo_id, due, every=0):
+        """设置或取消（due 为 None）提醒，没有变化时返回 False"""
+        todo = self._by_id[todo_id]
+        every = int(every or 0) if due is not None else 0
+        if todo.due == due and todo.every == every:
+            return False
+        todo.due = due
+        todo.every = every
+        return True
+
+    def with_reminders(self):
+        """所有带提醒的记录"""
+        return [todo for todo in self._order if todo.due is not None]
+
+    def to_dicts(self):
+        """按显示顺序导出为 {"title": ..., "done": ...} 列表（有提醒时带 "due"/"every"）"""
+        return [todo.to_dict() for todo in self._order]
+
+    def clear(self):
+        """清空所有记录（ID 继续递增，不会复用）"""
+        self._by_id = {}
+        self._by_key = {}
+        self._order = []
+        self._compact()
@@ -0,0 +1,281 @@
+import os
+import csv
+import json
+import argparse
+import itertools
+
+from storage import load_config, open_storage, normalize_title
+from archive import TodoArchive
+
+# 待办批量导入导出（不依赖 Qt）
+#
+# 支持两种格式，都是一行一条，按块流式读写，不会把整个文件读进内存：
+#   JSONL: {"title": ..., "done": ...}，也接受 ["标题", 是否完成] 或纯字符串
+#   CSV:   title,done 两列（有无表头均可）
+
+# 每块处理的条数：GUI 每处理一块就回到事件循环一次
+IMPORT_CHUNK_SIZE = 2000
+# 命令行导出 SQLite 时每页读取的条数
+EXPORT_PAGE_SIZE = 5000
+
+# 扩展名 -> 格式
+FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+}
+
+# CSV 中表示已完成的值
+DONE_VALUES = {"1", "true", "yes", "y", "x", "done", "是", "完成", "已完成", "✓", "√"}
+
+
+def detect_format(path, fmt=None):
+    """按扩展名推断格式，无法识别时抛出 ValueError"""
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS.values():
+        raise ValueError(f"无法识别的格式: {path}（支持 .jsonl / .csv）")
+    return fmt
+
+
+def parse_done(value):
+    """CSV/JSON 中的完成状态 -> bool"""
+    if isinstance(value, str):
+        return value.strip().casefold() in DONE_VALUES
+    return bool(value)
+
+
+def iter_chunks(items, size=IMPORT_CHUNK_SIZE):
+    """把可迭代对象切成列表块"""
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TodoReader:
+    """逐行读取 JSONL/CSV 待办文件
+
+    按二进制读取并记录已读字节数（position / size），方便显示进度。
+    无效的行会被跳过并计入 invalid。
+    """
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = detect_format(path, fmt)
+        self.size = os.path.getsize(path)
+        self.position = 0
+        self.invalid = 0
+        self._file = open(path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _lines(self):
+        first = True
+        for raw in self._file:
+            self.position += len(raw)
+            line = raw.decode('utf-8', errors='replace')
+            if first:
+                # Excel 导出的 CSV 带 BOM
+                line = line.lstrip("\ufeff")
+                first = False
+            yield line
+
+    def __iter__(self):
+        if self.fmt == "csv":
+            return self._iter_csv()
+        return self._iter_jsonl()
+
+    def _iter_jsonl(self):
+        for line in self._lines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                self.invalid += 1
+                continue
+            if isinstance(record, dict):
+                title, done = record.get("title"), record.get("done", False)
+            elif isinstance(record, list) and record:
+                title, done = record[0], record[1] if len(record) > 1 else False
+            else:
+                title, done = record, False
+            if not isinstance(title, str) or not title.strip():
+                self.invalid += 1
+                continue
+            yield {"title": title, "done": parse_done(done)}
+
+    def _iter_csv(self):
+        title_col, done_col = 0, 1
+        for i, row in enumerate(csv.reader(self._lines())):
+            if not row:
+                continue
+            if i == 0:
+                header = [cell.strip().casefold() for cell in row]
+                if "title" in header:
+                    title_col = header.index("title")
+                    done_col = header.index("done") if "done" in header else None
+                    continue
+            if title_col >= len(row) or not row[title_col].strip():
+                self.invalid += 1
+                continue
+            done = done_col is not None and done_col < len(row) and parse_done(row[done_col])
+            yield {"title": row[title_col], "done": done}
+
+
+class TodoWriter:
+    """流式写出 JSONL/CSV：先写临时文件，commit 时再替换目标文件"""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = detect_format(path, fmt)
+        self.count = 0
+        self._tmp_file = path + ".tmp"
+        self._file = open(self._tmp_file, 'w', encoding='utf-8', newline='')
+        if self.fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(["title", "done"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, todos):
+        """写出一批待办"""
+        if self.fmt == "csv":
+            for todo in todos:
+                self._csv.writerow([todo["title"], int(bool(todo["done"]))])
+                self.count += 1
+        else:
+            for todo in todos:
+                self._file.write(json.dumps({"title": todo["title"], "done": bool(todo["done"])},
+                                            ensure_ascii=False) + "\n")
+                self.count += 1
+
+    def commit(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        os.replace(self._tmp_file, self.path)
+
+    def abort(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        try:
+            os.remove(self._tmp_file)
+        except OSError:
+            pass
+
+
+def iter_stored(storage):
+    """逐条读取存储中的待办；SQLite 分页读取，不一次加载全部"""
+    if hasattr(storage, "query"):
+        offset = 0
+        while True:
+            page = storage.query(limit=EXPORT_PAGE_SIZE, offset=offset)
+            yield from page
+            if len(page) < EXPORT_PAGE_SIZE:
+                return
+            offset += len(page)
+    else:
+        data = storage.load()
+        if data is not None:
+            yield from data.get("todos", [])
+
+
+def export_storage(storage, path, fmt=None):
+    """把存储中的待办导出到文件，返回条数"""
+    with TodoWriter(path, fmt) as writer:
+        for chunk in iter_chunks(iter_stored(storage), EXPORT_PAGE_SIZE):
+            writer.write(chunk)
+    return writer.count
+
+
+def import_storage(storage, path, fmt=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None, archive=None):
+    """把文件中的待办按块导入存储，跳过重复项和已归档（archive 可为 None）的标题，返回 (导入数, 跳过数)
+
+    每块作为一批变更保存。整文件 JSON 存储需要完整快照，只能在最后保存一次。
+    progress(已读字节, 总字节) 在每块之后调用。
+    """
+    if hasattr(storage, "count"):
+        # SQLite 由唯一约束查重，不需要先加载已有数据
+        data, keys, before = {}, None, storage.count()
+    else:
+        data = storage.load() or {"todos": [], "lastEmotion": "normal"}
+        keys = {normalize_title(todo["title"]) for todo in data["todos"]}
+        if not storage.needs_snapshot:
+            # 只需要已有标题做查重
+            data = {}
+    added = total = 0
+    with TodoReader(path, fmt) as reader:
+        for chunk in iter_chunks(reader, chunk_size):
+            total += len(chunk)
+            changes = []
+            for todo in chunk:
+                title = todo["title"].strip()
+                key = normalize_title(title)
+                if archive is not None and key in archive:
+                    continue
+                if keys is not None:
+                    if key in keys:
+                        continue
+                    keys.add(key)
+                changes.append({"op": "add", "title": title, "done": todo["done"]})
+            if storage.needs_snapshot:
+                data["todos"].extend({"title": c["title"], "done": c["done"]} for c in changes)
+            elif changes:
+                storage.save(data, changes)
+            added += len(changes)
+            if progress is not None:
+                progress(reader.position, reader.size)
+        invalid = reader.invalid
+    if storage.needs_snapshot and added:
+        storage.save(data, [])
+    if keys is None:
+        added = storage.count() - before
+    return added, total - added + invalid
+
+
+def add_arguments(parser):
+    parser.add_argument("--import", dest="import_path", metavar="FILE", help="从 JSONL/CSV 文件导入待办")
+    parser.add_argument("--export", dest="export_path", metavar="FILE", help="把待办导出为 JSONL/CSV 文件")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="文件格式（默认按扩展名）")
+
+
+def main(argv, data_dir, legacy_files=()):
+    """命令行导入导出，不启动界面"""
+    parser = argparse.ArgumentParser(description="TodoNeko 待办导入导出")
+    add_arguments(parser)
+    args, _ = parser.parse_known_args(argv)
+
+    storage = open_storage(data_dir, load_config(data_dir), legacy_files=legacy_files)
+    try:
+        if args.import_path:
+            # 与界面上的导入相同，已归档的标题不再加回列表
+            added, skipped = import_storage(storage, args.import_path, args.format, archive=TodoArchive(data_dir))
+            print(f"已导入 {added} 项，跳过 {skipped} 项")
+        if args.export_path:
+            count = export_storage(storage, args.export_path, args.format)
+            print(f"已导出 {count} 项到 {args.export_path}")
+    except (OSError, ValueError) as e:
+        print(f"导入导出失败: {e}")
+        return 1
+    finally:
+        storage.close()
+    return 0